@@ -0,0 +1,196 @@
+"""Per-stage microbenchmarks of the receive and render hot path.
+
+Times each stage in isolation at realistic sizes, without a display (Qt runs on
+the offscreen platform), and compares the results with the stored baselines in
+benchmarks/baselines.json. Baselines depend on the machine, so save them on the
+machine used for comparisons before changing the hot path.
+
+    python benchmarks/stages.py              # compare with the baselines
+    python benchmarks/stages.py --save       # store the current results as baselines
+    python benchmarks/stages.py --check      # exit with an error on regressions
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import numpy as np
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from nanogui.buffer import DEFAULT_CAPACITY, RingBuffer
+from nanogui.compression import ChunkCodec
+from nanogui.decimation import MinMaxPyramid
+from nanogui.emulator import SignalGenerator
+from nanogui.events import EventDetector
+from nanogui.framing import FrameDecoder, encode_message
+from nanogui.schema import DEFAULT_SCHEMA
+from nanogui.spectrum import WelchAccumulator
+from nanogui.timeline import TimeUnwrapper
+from nanogui.trigger import TriggerEngine
+
+BASELINES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+BLOCK_FRAMES = 512
+VIEW_BINS = 1200
+
+def _measure(operation, min_time: float, rounds: int) -> float:
+    """Get the median seconds per call of an operation over several timed rounds."""
+    operation()
+    calls = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(calls):
+            operation()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / rounds:
+            break
+        calls *= 2
+
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(calls):
+            operation()
+        timings.append((time.perf_counter() - start) / calls)
+    return statistics.median(timings)
+
+def _appender(target, values: np.ndarray, time_values: np.ndarray):
+    """Get an operation appending the same block to a buffer or pyramid with advancing timestamps."""
+    span = int(time_values[-1] - time_values[0]) + int(time_values[1] - time_values[0])
+    state = {"offset": int(time_values[-1]) + span}
+    def run() -> None:
+        target.append(values, time_values + state["offset"])
+        state["offset"] += span
+    return run
+
+def _full_pyramid() -> MinMaxPyramid:
+    """Get a decimation pyramid holding a full history."""
+    generator = SignalGenerator(seed=0)
+    frames = generator.frames(DEFAULT_CAPACITY // DEFAULT_SCHEMA.samples)
+    values, counter = DEFAULT_SCHEMA.split(frames)
+    pyramid = MinMaxPyramid(RingBuffer(DEFAULT_CAPACITY))
+    pyramid.append(values, TimeUnwrapper(DEFAULT_SCHEMA.time_period).unwrap(counter))
+    return pyramid
+
+def build_stages() -> dict:
+    """Create the benchmarked operations.
+
+    returns:
+        dict: Operation of each stage, each processing one block of 512 frames unless noted.
+    """
+    generator = SignalGenerator(seed=0)
+    frames = generator.frames(BLOCK_FRAMES)
+    wire_v1 = DEFAULT_SCHEMA.encode(frames)
+    wire_v2 = encode_message(frames, 0, DEFAULT_SCHEMA)
+    values, counter = DEFAULT_SCHEMA.split(frames)
+    time_values = TimeUnwrapper(DEFAULT_SCHEMA.time_period).unwrap(counter)
+
+    def decode(wire: bytes):
+        decoder = FrameDecoder(DEFAULT_SCHEMA)
+        def run() -> None:
+            data = wire
+            while data:
+                buffer = decoder.get_buffer()
+                n = min(len(buffer), len(data))
+                buffer[:n] = data[:n]
+                decoder.commit(n)
+                data = data[n:]
+        return run
+
+    buffer = RingBuffer(DEFAULT_CAPACITY)
+    pyramid = _full_pyramid()
+    unwrapper = TimeUnwrapper(DEFAULT_SCHEMA.time_period)
+    detector = EventDetector()
+    spectrum = WelchAccumulator()
+    trigger = TriggerEngine(level=800.0)
+    codec = ChunkCodec(DEFAULT_SCHEMA, "zlib")
+    chunk = generator.frames(4096)
+    compressed = codec.encode(chunk)
+
+    stages = {
+        "decode.v1": decode(wire_v1),
+        "decode.v2": decode(wire_v2),
+        "split": lambda: DEFAULT_SCHEMA.split(frames),
+        "unwrap": lambda: unwrapper.unwrap(counter),
+        "buffer.append": _appender(buffer, values, time_values),
+        "pyramid.append": _appender(pyramid, values, time_values),
+        "pyramid.view": lambda: pyramid.view(0, VIEW_BINS),
+        "events.process": lambda: detector.process(values, time_values),
+        "spectrum.append": lambda: spectrum.append(values, time_values),
+        "trigger.process": lambda: trigger.process(values, time_values),
+        "codec.encode_4096": lambda: codec.encode(chunk),
+        "codec.decode_4096": lambda: codec.decode(compressed, len(chunk)),
+    }
+    stages.update(_qt_stages(pyramid))
+    return stages
+
+def _qt_stages(pyramid: MinMaxPyramid) -> dict:
+    """Create the plotting operations on the offscreen Qt platform."""
+    import pyqtgraph as pg
+    from PySide6.QtWidgets import QApplication
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    plot_widget = pg.PlotWidget()
+    plot_widget.resize(VIEW_BINS, 400)
+    curve = plot_widget.plot(pen=pg.mkPen(color=(255, 0, 0), width=2))
+    x_data, y_data = pyramid.view(0, VIEW_BINS)
+
+    def paint() -> None:
+        curve.setData(x=x_data, y=y_data)
+        plot_widget.grab()
+        app.processEvents()
+
+    return {
+        "plot.set_data": lambda: curve.setData(x=x_data, y=y_data),
+        "plot.set_data_paint": paint,
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filter", default="", help="only run stages whose name contains this text")
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds spent timing each stage (default: 0.5)")
+    parser.add_argument("--rounds", type=int, default=5, help="timed rounds per stage, the median is reported (default: 5)")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="slowdown over the baseline reported as a regression (default: 0.25)")
+    parser.add_argument("--save", action="store_true", help="store the results as the new baselines")
+    parser.add_argument("--check", action="store_true", help="exit with status 1 if any stage regressed")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    baselines = {}
+    if os.path.exists(BASELINES):
+        with open(BASELINES) as file:
+            baselines = json.load(file)
+
+    results = {}
+    for name, operation in build_stages().items():
+        if args.filter in name:
+            results[name] = _measure(operation, args.min_time, args.rounds)
+
+    regressions = []
+    if args.json:
+        print(json.dumps(results))
+    else:
+        print(f"{'stage':<22}{'us/op':>12}{'baseline':>12}{'ratio':>8}")
+    for name, seconds in results.items():
+        baseline = baselines.get(name)
+        ratio = seconds / baseline if baseline else None
+        if ratio is not None and ratio > 1 + args.tolerance:
+            regressions.append(name)
+        if not args.json:
+            baseline_text = f"{baseline * 1e6:>12.1f}" if baseline else f"{'-':>12}"
+            ratio_text = f"{ratio:>8.2f}" if ratio is not None else f"{'-':>8}"
+            flag = "  REGRESSED" if name in regressions else ""
+            print(f"{name:<22}{seconds * 1e6:>12.1f}{baseline_text}{ratio_text}{flag}")
+
+    if args.save:
+        baselines.update(results)
+        with open(BASELINES, "w") as file:
+            json.dump(dict(sorted(baselines.items())), file, indent=2)
+            file.write("\n")
+        print(f"Saved {len(results)} baselines to {BASELINES}")
+    if args.check and regressions:
+        raise SystemExit(f"Regressed: {', '.join(regressions)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""End-to-end throughput and control-bit latency benchmark.
+
+Runs TCPServer without a GUI and feeds it from the synthetic controller in a
+separate process, then reports sustained frame rate, dropped and malformed
+frames, server CPU time per frame and control-bit round-trip latency. With
+--acquisition-process the CPU time only covers the reading side.
+
+    python benchmarks/throughput.py --duration 10 --rate max
+"""
+import argparse
+import json
+import multiprocessing
+import threading
+import time
+import numpy as np
+from nanogui.acquisition import AcquisitionServer
+from nanogui.context import ApplicationContext
+from nanogui.emulator import EmulatorClient, SignalGenerator
+from nanogui.metrics import get_metrics
+from nanogui.schema import DEFAULT_SCHEMA
+from nanogui.server import TCPServer
+from nanogui.sinks import CallbackSink
+
+SAMPLE_RATE = 100_000
+TIME_STEP = 1_000_000 // SAMPLE_RATE
+BASELINE = 1000
+CONTROL_GAIN = 50
+CONTROL_PATTERNS = (0b11111111, 0b00000000)
+
+def _run_emulator(host: str, port: int, duration: float, paced: bool, protocol: int, batch_frames: int, result: multiprocessing.Queue) -> None:
+    """Stream emulator frames from a child process."""
+    generator = SignalGenerator(sample_rate=SAMPLE_RATE, baseline=BASELINE, noise=5.0, event_rate=0.0, control_gain=CONTROL_GAIN)
+    client = EmulatorClient(host, port, generator, batch_frames=batch_frames, paced=paced, protocol=protocol)
+    client.connect()
+    client.run(duration)
+    result.put(client.frames_sent)
+
+class BenchmarkSink:
+    """Collect statistics from received frame blocks on the receive thread."""
+    def __init__(self) -> None:
+        self.frames = 0
+        self.blocks = 0
+        self.discontinuities = 0
+        self.first_time = None
+        self.last_time = None
+        self.expected_level = BASELINE
+        self.control_sent = None
+        self.latencies = []
+        self._previous_sample = None
+
+    def on_data(self, frames: np.ndarray) -> None:
+        if len(frames) == 0:
+            return
+        now = time.perf_counter()
+        if self.first_time is None:
+            self.first_time = now
+        self.last_time = now
+        self.frames += len(frames)
+        self.blocks += 1
+
+        timestamps = frames[DEFAULT_SCHEMA.time_field].ravel()
+        if self._previous_sample is not None:
+            timestamps = np.concatenate(([self._previous_sample], timestamps))
+        steps = np.diff(timestamps.astype(np.int64)) % 65536
+        self.discontinuities += int(np.count_nonzero(steps != TIME_STEP))
+        self._previous_sample = timestamps[-1]
+
+        if self.control_sent is not None:
+            means = frames[DEFAULT_SCHEMA.channels[0]].mean(axis=1)
+            reacted = np.abs(means - self.expected_level) < CONTROL_GAIN * 2
+            if reacted.any():
+                self.latencies.append(now - self.control_sent)
+                self.control_sent = None
+
+def run_benchmark(duration: float, paced: bool, port: int, acquisition_process: bool = False, protocol: int = 1, batch_frames: int = 32) -> dict:
+    """Run the benchmark and return the results."""
+    context = ApplicationContext()
+    context.set_host("127.0.0.1")
+    context.set_port(port)
+    server = AcquisitionServer(context) if acquisition_process else TCPServer(context)
+    sink = BenchmarkSink()
+    server.add_sink(CallbackSink(sink.on_data))
+    server.start_server()
+
+    result = multiprocessing.Queue()
+    emulator = multiprocessing.Process(target=_run_emulator, args=("127.0.0.1", port, duration, paced, protocol, batch_frames, result))
+    cpu_start = time.process_time()
+    emulator.start()
+
+    control_thread = threading.Thread(target=_toggle_control_bits, args=(server, context, sink, emulator), daemon=True)
+    control_thread.start()
+    emulator.join()
+    frames_sent = result.get()
+    time.sleep(0.2)
+    cpu = time.process_time() - cpu_start
+    server.stop_server()
+
+    elapsed = (sink.last_time - sink.first_time) if sink.frames else 0.0
+    latencies = np.array(sink.latencies) * 1000
+    return {
+        "frames_sent": frames_sent,
+        "frames_received": sink.frames,
+        "frames_dropped": frames_sent - sink.frames,
+        "time_discontinuities": sink.discontinuities,
+        "sequence_gaps": get_metrics().counter("sequence_gaps").value,
+        "blocks_received": sink.blocks,
+        "frames_per_second": sink.frames / elapsed if elapsed else 0.0,
+        "cpu_us_per_frame": cpu / sink.frames * 1e6 if sink.frames else 0.0,
+        "control_round_trips": len(latencies),
+        "control_latency_ms_median": float(np.median(latencies)) if len(latencies) else None,
+        "control_latency_ms_p99": float(np.percentile(latencies, 99)) if len(latencies) else None,
+    }
+
+def _toggle_control_bits(server: TCPServer | AcquisitionServer, context: ApplicationContext, sink: BenchmarkSink, emulator: multiprocessing.Process) -> None:
+    """Alternate the control bits and time how long the emulator takes to react."""
+    time.sleep(0.5)
+    i = 0
+    while emulator.is_alive():
+        bits = CONTROL_PATTERNS[i % 2]
+        context.set_control_bits([int(bit) for bit in f"{bits:08b}"])
+        sink.expected_level = BASELINE + CONTROL_GAIN * bits.bit_count()
+        sink.control_sent = time.perf_counter()
+        server.send_control_bits()
+        i += 1
+        time.sleep(0.25)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds to stream for (default: 5)")
+    parser.add_argument("--rate", choices=("real", "max"), default="max", help="emulator pacing (default: max)")
+    parser.add_argument("--port", type=int, default=8899, help="server port (default: 8899)")
+    parser.add_argument("--protocol", type=int, choices=(1, 2), default=1, help="wire protocol version sent by the emulator (default: 1)")
+    parser.add_argument("--batch", type=int, default=32, help="frames per send, or per message with protocol 2 (default: 32)")
+    parser.add_argument("--acquisition-process", action="store_true", help="receive in a separate process through the shared-memory ring")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.duration, args.rate == "real", args.port, args.acquisition_process, args.protocol, args.batch)
+    if args.json:
+        print(json.dumps(results))
+        return
+    for name, value in results.items():
+        print(f"{name:>28}: {value:.3f}" if isinstance(value, float) else f"{name:>28}: {value}")
+
+if __name__ == "__main__":
+    main()
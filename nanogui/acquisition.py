@@ -0,0 +1,424 @@
+import logging
+import multiprocessing
+import threading
+from multiprocessing import shared_memory
+import numpy as np
+from nanogui.context import ApplicationContext
+from nanogui.log import forward_logging, handle_forwarded, shutdown_logging
+from nanogui import profiling
+from nanogui.metrics import get_metrics
+from nanogui.schema import DEFAULT_SCHEMA, FrameSchema
+from nanogui.server import TCPServer
+from nanogui.sinks import DataSink
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RING_CAPACITY = 1 << 16
+START_TIMEOUT = 10.0
+MESSAGE_POLL_INTERVAL = 0.1
+
+# int64 header slots in front of the frames
+_COMMITTED, _RESERVED = 0, 1
+_MIRRORED_COUNTERS = ("bytes_received", "frames_received", "partial_frames", "decode_errors", "messages_received", "sequence_gaps")
+_HEADER_SLOTS = 2 + len(_MIRRORED_COUNTERS)
+_HEADER_SIZE = _HEADER_SLOTS * 8
+
+class SharedFrameRing:
+    """Single-producer ring of frames in shared memory.
+
+    The producer reserves the frames it is about to write, writes them, then
+    commits them. A reader keeps its own position; frames it fell more than a
+    ring behind on, or that were reserved for overwriting while it was copying,
+    are reported as lost instead of returned torn. The header also carries the
+    producer's receive counters.
+
+    params:
+        capacity (int): Number of frames in the ring.
+        name (str | None): Name of an existing ring to attach to, or None to create one.
+        schema (FrameSchema): Layout of one frame.
+    """
+    def __init__(self, capacity: int = DEFAULT_RING_CAPACITY, name: str | None = None, schema: FrameSchema = DEFAULT_SCHEMA) -> None:
+        self._capacity = capacity
+        size = _HEADER_SIZE + capacity * schema.dtype.itemsize
+        if name is None:
+            self._memory = shared_memory.SharedMemory(create=True, size=size)
+            self._owner = True
+        else:
+            # spawned children share the creator's resource tracker, so attaching does not take ownership
+            self._memory = shared_memory.SharedMemory(name=name)
+            self._owner = False
+
+        self._header = np.ndarray((_HEADER_SLOTS,), dtype=np.int64, buffer=self._memory.buf)
+        self._frames = np.ndarray((capacity,), dtype=schema.dtype, buffer=self._memory.buf, offset=_HEADER_SIZE)
+        if self._owner:
+            self._header[:] = 0
+        self._read = int(self._header[_COMMITTED])
+
+    @property
+    def name(self) -> str:
+        """Name of the shared memory block, used to attach from another process."""
+        return self._memory.name
+
+    @property
+    def capacity(self) -> int:
+        """Number of frames in the ring."""
+        return self._capacity
+
+    def write(self, frames: np.ndarray) -> None:
+        """Write a block of frames, overwriting the oldest ones.
+
+        params:
+            frames (np.ndarray): Frames with shape (n,) in the schema's dtype.
+        """
+        n = len(frames)
+        committed = int(self._header[_COMMITTED])
+        if n > self._capacity:
+            frames = frames[-self._capacity:]
+        self._header[_RESERVED] = committed + n
+
+        start = (committed + n - len(frames)) % self._capacity
+        first = min(len(frames), self._capacity - start)
+        self._frames[start:start + first] = frames[:first]
+        self._frames[:len(frames) - first] = frames[first:]
+        self._header[_COMMITTED] = committed + n
+
+    def read(self) -> tuple[np.ndarray | None, int]:
+        """Copy the frames committed since the previous read.
+
+        returns:
+            tuple[np.ndarray | None, int]: New frames, or None if there are none, and the number of frames lost.
+        """
+        committed = int(self._header[_COMMITTED])
+        position = self._read
+        if committed == position:
+            return None, 0
+
+        lost = max(committed - position - self._capacity, 0)
+        position += lost
+        start = position % self._capacity
+        count = committed - position
+        first = min(count, self._capacity - start)
+        frames = np.empty(count, dtype=self._frames.dtype)
+        frames[:first] = self._frames[start:start + first]
+        frames[first:] = self._frames[:count - first]
+
+        # frames the producer started overwriting during the copy
+        overwritten = min(max(int(self._header[_RESERVED]) - self._capacity - position, 0), count)
+        self._read = committed
+        return (frames[overwritten:] if overwritten < count else None), lost + overwritten
+
+    def set_counters(self, values: list[int]) -> None:
+        """Publish the producer's receive counters.
+
+        params:
+            values (list[int]): Value of each mirrored counter.
+        """
+        self._header[2:] = values
+
+    def get_counters(self) -> dict[str, int]:
+        """Get the producer's receive counters.
+
+        returns:
+            dict[str, int]: Value of each mirrored counter.
+        """
+        return dict(zip(_MIRRORED_COUNTERS, self._header[2:].tolist()))
+
+    def close(self) -> None:
+        """Unmap the ring, and free it if this instance created it."""
+        del self._header, self._frames
+        self._memory.close()
+        if self._owner:
+            self._memory.unlink()
+
+class _RingSink(DataSink):
+    """Sink in the acquisition process writing frames to the shared ring."""
+    def __init__(self, ring: SharedFrameRing, data_ready, conn, conn_lock: threading.Lock) -> None:
+        self._ring = ring
+        self._data_ready = data_ready
+        self._conn = conn
+        self._conn_lock = conn_lock
+        metrics = get_metrics()
+        self._counters = [metrics.counter(name) for name in _MIRRORED_COUNTERS]
+        # frames were written since the last connection closed
+        self._connected = False
+        self._closed = threading.Event()
+
+    def write(self, frames: np.ndarray, controller_id: int = 0) -> None:
+        if not self._connected:
+            self._connected = True
+            self._closed.clear()
+        self._ring.write(frames)
+        self._ring.set_counters([counter.value for counter in self._counters])
+        self._data_ready.set()
+
+    def connection_closed(self, controller_id: int = 0) -> None:
+        self._ring.set_counters([counter.value for counter in self._counters])
+        with self._conn_lock:
+            self._conn.send(("closed", controller_id))
+        self._data_ready.set()
+        self._connected = False
+        self._closed.set()
+
+    def wait_closed(self, timeout: float) -> None:
+        """Wait until the connection frames were written for has closed."""
+        if self._connected:
+            self._closed.wait(timeout)
+
+def _acquisition_main(ring_name: str, capacity: int, schema: FrameSchema, host: str, port: int, conn, data_ready, log_records, log_level: int) -> None:
+    """Run a TCPServer in the acquisition process until told to stop."""
+    ring = SharedFrameRing(capacity, ring_name, schema)
+    conn_lock = threading.Lock()
+    forward_logging(log_records, log_level)
+
+    context = ApplicationContext()
+    context.set_host(host)
+    context.set_port(port)
+    context.set_schema(schema)
+    server = TCPServer(context)
+    sink = _RingSink(ring, data_ready, conn, conn_lock)
+    server.add_sink(sink)
+
+    try:
+        server.start_server()
+    except OSError as e:
+        with conn_lock:
+            conn.send(("error", str(e)))
+        ring.close()
+        return
+    with conn_lock:
+        conn.send(("started", None))
+
+    message_serial = 0
+    try:
+        while True:
+            message_serial, message = context.poll_message(message_serial)
+            if message is not None:
+                with conn_lock:
+                    conn.send(("message", message))
+            if not conn.poll(MESSAGE_POLL_INTERVAL):
+                continue
+            command, value = conn.recv()
+            if command == "control":
+                context.set_control_bits(value)
+                server.send_control_bits()
+            elif command == "write":
+                try:
+                    server.write_control_bits(value)
+                except OSError:
+                    pass
+            elif command == "stop":
+                break
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        server.stop_server()
+        sink.wait_closed(START_TIMEOUT)
+        # the parent reads the pipe until this process exits
+        message_serial, message = context.poll_message(message_serial)
+        if message is not None:
+            try:
+                with conn_lock:
+                    conn.send(("message", message))
+            except OSError:
+                pass
+        ring.close()
+        # pass on the counts of repeated messages still pending
+        shutdown_logging()
+
+class AcquisitionServer:
+    """TCPServer running in a separate acquisition process.
+
+    The child process owns the sockets, decodes frames and writes them into a
+    shared-memory ring, so receiving is not slowed down by the GIL held by the
+    GUI. A reader thread in this process copies new frames out of the ring and
+    passes them to the data sinks, just like TCPServer's receive thread. Control
+    bits and status messages go over a pipe and log records over a queue, which
+    the reader thread hands to this process's logging. Frames overwritten before
+    they were read are counted as dropped.
+
+    params:
+        context (ApplicationContext): The application context.
+        capacity (int): Number of frames in the shared ring.
+    """
+    def __init__(self, context: ApplicationContext, capacity: int = DEFAULT_RING_CAPACITY) -> None:
+        self._context = context
+        self._capacity = capacity
+        self._sinks = ()
+        self._process = None
+        self._conn = None
+        self._conn_lock = threading.Lock()
+        self._ring = None
+        self._data_ready = None
+        self._log_records = None
+        self._reader = None
+        self._running = False
+        self._stopping = False
+
+        metrics = get_metrics()
+        self._dropped = metrics.counter("frames_dropped")
+        self._dispatch_stage = profiling.stage("receive.dispatch")
+        self._counters = {name: metrics.counter(name) for name in _MIRRORED_COUNTERS}
+        self._mirrored = dict.fromkeys(_MIRRORED_COUNTERS, 0)
+
+    def add_sink(self, sink: DataSink) -> None:
+        """Add a consumer of received frames.
+
+        params:
+            sink (DataSink): The sink to add.
+        """
+        self._sinks = self._sinks + (sink,)
+
+    def remove_sink(self, sink: DataSink) -> None:
+        """Remove a consumer of received frames.
+
+        params:
+            sink (DataSink): Previously added sink.
+        """
+        self._sinks = tuple(s for s in self._sinks if s is not sink)
+
+    def start_server(self) -> None:
+        """Start the acquisition process listening on the host and port from context."""
+        host = self._context.get_host()
+        port = self._context.get_port()
+
+        if not host or not port:
+            logger.warning("Please set the host and port.")
+            self._context.set_message("Please set the host and port.")
+            return
+
+        # spawn rather than fork, the GUI process has Qt threads running
+        mp_context = multiprocessing.get_context("spawn")
+        schema = self._context.get_schema()
+        self._ring = SharedFrameRing(self._capacity, schema=schema)
+        self._data_ready = mp_context.Event()
+        self._conn, child_conn = mp_context.Pipe()
+        self._log_records = mp_context.Queue()
+        self._process = mp_context.Process(
+            target=_acquisition_main,
+            args=(self._ring.name, self._capacity, schema, host, port, child_conn, self._data_ready,
+                  self._log_records, logging.getLogger("nanogui").getEffectiveLevel()),
+            daemon=True,
+        )
+        self._process.start()
+        child_conn.close()
+
+        if not self._conn.poll(START_TIMEOUT):
+            self._shutdown()
+            raise OSError("Acquisition process did not start.")
+        status, error = self._conn.recv()
+        if status == "error":
+            self._shutdown()
+            raise OSError(error)
+
+        self._running = True
+        self._reader = threading.Thread(target=profiling.profiled(self._read_loop), daemon=True)
+        self._reader.start()
+        logger.info(f"Acquisition process listening on {host}:{port}")
+        self._context.set_message(f"Acquisition process listening on {host}:{port}")
+
+    def _read_loop(self) -> None:
+        """Pass frames from the ring to the sinks and handle messages from the acquisition process."""
+        while self._running:
+            self._data_ready.wait(0.05)
+            self._data_ready.clear()
+            self._drain()
+            handle_forwarded(self._log_records)
+            try:
+                while self._conn.poll():
+                    self._handle_message(*self._conn.recv())
+            except (EOFError, OSError):
+                if self._running and not self._stopping:
+                    logger.warning("Acquisition process exited.")
+                    self._context.set_message("Acquisition process exited.")
+                break
+
+    def _drain(self) -> None:
+        """Dispatch every committed frame and mirror the receive counters."""
+        frames, lost = self._ring.read()
+        if lost:
+            self._dropped.inc(lost)
+        if frames is not None:
+            with self._dispatch_stage:
+                for sink in self._sinks:
+                    sink.write(frames)
+
+        for name, value in self._ring.get_counters().items():
+            self._counters[name].inc(value - self._mirrored[name])
+            self._mirrored[name] = value
+
+    def _handle_message(self, kind: str, value) -> None:
+        """Handle a message from the acquisition process."""
+        if kind == "message":
+            self._context.set_message(value)
+        elif kind == "closed":
+            # frames committed before the connection closed
+            self._drain()
+            for sink in self._sinks:
+                sink.connection_closed(value)
+
+    def send_control_bits(self) -> None:
+        """Send control bits to client through the acquisition process."""
+        if not self._running:
+            logger.warning("Server not running.")
+            self._context.set_message("Server not running.")
+            return
+
+        control_bits = self._context.get_control_bits()
+        with self._conn_lock:
+            self._conn.send(("control", [int(bit) for bit in f"{control_bits:08b}"]))
+
+    def write_control_bits(self, control_bits: int) -> None:
+        """Send an 8-bit control pattern through the acquisition process without reporting it.
+
+        The pattern is handed to the process over the pipe, so the socket send
+        happens slightly after this returns.
+
+        params:
+            control_bits (int): Control bits as an 8-bit integer.
+        """
+        if not self._running:
+            raise ConnectionError("Server not running.")
+        with self._conn_lock:
+            self._conn.send(("write", control_bits))
+
+    def stop_server(self) -> None:
+        """Stop the acquisition process after passing on everything it received."""
+        forwarded = self._process is not None
+        if self._running:
+            self._stopping = True
+            try:
+                with self._conn_lock:
+                    self._conn.send(("stop", None))
+            except OSError:
+                pass
+            # the reader keeps handling frames and messages until the process closes the pipe
+            self._reader.join(START_TIMEOUT)
+            self._running = False
+            self._reader.join()
+            self._drain()
+            handle_forwarded(self._log_records)
+            self._stopping = False
+        self._shutdown()
+        # the acquisition process reports its server stopping through the pipe and log queue
+        if not forwarded:
+            logger.info("Server stopped.")
+            self._context.set_message("Server stopped.")
+
+    def _shutdown(self) -> None:
+        """Wait for the acquisition process and release the pipe and ring."""
+        if self._process:
+            self._process.join(START_TIMEOUT)
+            if self._process.is_alive():
+                self._process.terminate()
+                self._process.join()
+            self._process = None
+        if self._log_records:
+            handle_forwarded(self._log_records)
+            self._log_records.close()
+            self._log_records = None
+        if self._conn:
+            self._conn.close()
+            self._conn = None
+        if self._ring:
+            self._ring.close()
+            self._ring = None
@@ -0,0 +1,219 @@
+import asyncio
+import logging
+import threading
+import numpy as np
+from nanogui.context import ApplicationContext
+from nanogui.framing import FrameDecoder
+from nanogui import profiling
+from nanogui.metrics import get_metrics
+from nanogui.sinks import DataSink
+
+logger = logging.getLogger(__name__)
+
+class _ControllerProtocol(asyncio.BufferedProtocol):
+    """Protocol for one controller connection with its own framing state.
+
+    params:
+        server (AsyncTCPServer): Owning server.
+        controller_id (int): ID assigned to the connection.
+    """
+    def __init__(self, server: "AsyncTCPServer", controller_id: int) -> None:
+        self._server = server
+        self._controller_id = controller_id
+        self._decoder = FrameDecoder(server._context.get_schema())
+        metrics = get_metrics()
+        self._bytes_received = metrics.counter("bytes_received")
+        self._frames_received = metrics.counter("frames_received")
+        self._partial_frames = metrics.counter("partial_frames")
+        self._decode_errors = metrics.counter("decode_errors")
+        self._decode_stage = profiling.stage("receive.decode")
+        self._dispatch_stage = profiling.stage("receive.dispatch")
+        self.transport = None
+        self.address = None
+
+    def connection_made(self, transport: asyncio.Transport) -> None:
+        self.transport = transport
+        self.address = transport.get_extra_info("peername")
+        self._server._register(self._controller_id, self)
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        return self._decoder.get_buffer()
+
+    def buffer_updated(self, nbytes: int) -> None:
+        with self._decode_stage:
+            frames = self._decoder.commit(nbytes)
+        self._bytes_received.inc(nbytes)
+        self._frames_received.inc(len(frames))
+        if self._decoder.pending:
+            self._partial_frames.inc()
+        if len(frames):
+            with self._dispatch_stage:
+                self._server._dispatch(frames, self._controller_id)
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        if self._decoder.pending:
+            # connection ended inside a frame
+            self._decode_errors.inc()
+        self._server._unregister(self._controller_id)
+
+class AsyncTCPServer:
+    """TCP server accepting many controllers on a single asyncio event loop.
+
+    Each connection gets a controller ID and its own frame decoder. Received
+    frames are passed to the data sinks tagged with the controller ID. Control
+    bits go through the same methods as TCPServer's, to one controller or to
+    all of them. The event loop runs on a background thread.
+
+    params:
+        context (ApplicationContext): The application context.
+    """
+    def __init__(self, context: ApplicationContext) -> None:
+        self._context = context
+        self._sinks = ()
+        self._controllers = {}
+        self._next_controller_id = 1
+        self._loop = None
+        self._server = None
+        self._thread = None
+
+    def add_sink(self, sink: DataSink) -> None:
+        """Add a consumer of received frames.
+
+        params:
+            sink (DataSink): The sink to add.
+        """
+        self._sinks = self._sinks + (sink,)
+
+    def remove_sink(self, sink: DataSink) -> None:
+        """Remove a consumer of received frames.
+
+        params:
+            sink (DataSink): Previously added sink.
+        """
+        self._sinks = tuple(s for s in self._sinks if s is not sink)
+
+    def controllers(self) -> dict[int, tuple]:
+        """Get the connected controllers.
+
+        returns:
+            dict[int, tuple]: Peer address of each connected controller ID.
+        """
+        return {controller_id: protocol.address for controller_id, protocol in list(self._controllers.items())}
+
+    def start_server(self) -> None:
+        """Start server given host and port from context."""
+        host = self._context.get_host()
+        port = self._context.get_port()
+
+        if not host or not port:
+            logger.warning("Please set the host and port.")
+            self._context.set_message("Please set the host and port.")
+            return
+
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._server = self._loop.run_until_complete(self._loop.create_server(self._create_protocol, host, port))
+        except OSError:
+            self._loop.close()
+            self._loop = None
+            raise
+
+        self._thread = threading.Thread(target=profiling.profiled(self._loop.run_forever), daemon=True)
+        self._thread.start()
+        logger.info(f"Server listening on {host}:{port}")
+        self._context.set_message(f"Server listening on {host}:{port}")
+
+    def _create_protocol(self) -> _ControllerProtocol:
+        """Create the protocol for a new connection."""
+        controller_id = self._next_controller_id
+        self._next_controller_id += 1
+        return _ControllerProtocol(self, controller_id)
+
+    def _register(self, controller_id: int, protocol: _ControllerProtocol) -> None:
+        """Track a new controller connection."""
+        self._controllers[controller_id] = protocol
+        logger.info(f"Controller {controller_id} connected from {protocol.address}")
+        self._context.set_message(f"Controller {controller_id} connected from {protocol.address}")
+
+    def _unregister(self, controller_id: int) -> None:
+        """Forget a closed controller connection."""
+        self._controllers.pop(controller_id, None)
+        for sink in self._sinks:
+            sink.connection_closed(controller_id)
+        logger.info(f"Controller {controller_id} disconnected.")
+        self._context.set_message(f"Controller {controller_id} disconnected.")
+
+    def _dispatch(self, frames: np.ndarray, controller_id: int) -> None:
+        """Pass received frames to every sink."""
+        for sink in self._sinks:
+            sink.write(frames, controller_id)
+
+    def _targets(self, controller_id: int | None) -> list[_ControllerProtocol]:
+        """Get the connections of one controller, or of every controller if `controller_id` is None."""
+        if controller_id is None:
+            return list(self._controllers.values())
+        protocol = self._controllers.get(controller_id)
+        return [protocol] if protocol else []
+
+    def send_control_bits(self, *, controller_id: int | None = None) -> None:
+        """Send the context's control bits and report them. Safe to call from any thread.
+
+        params:
+            controller_id (int | None): Controller to send to, defaults to every connected controller.
+        """
+        if not self._loop:
+            logger.warning("Server not running.")
+            self._context.set_message("Server not running.")
+            return
+
+        control_bits = self._context.get_control_bits()
+        try:
+            self.write_control_bits(control_bits, controller_id=controller_id)
+        except ConnectionError as e:
+            logger.warning(str(e))
+            self._context.set_message(str(e))
+            return
+
+        binary_representation = f"0b{control_bits:08b}"
+        target = "every controller" if controller_id is None else f"controller {controller_id}"
+        logger.info(f"Sent control bits to {target}: {binary_representation}")
+        self._context.set_message(f"Sent control bits to {target}: {binary_representation}")
+
+    def write_control_bits(self, control_bits: int, *, controller_id: int | None = None) -> None:
+        """Send an 8-bit control pattern without reporting it. Safe to call from any thread.
+
+        The write is scheduled on the event loop, so it happens slightly after
+        this returns.
+
+        params:
+            control_bits (int): Control bits as an 8-bit integer.
+            controller_id (int | None): Controller to send to, defaults to every connected controller.
+        """
+        loop = self._loop
+        targets = self._targets(controller_id)
+        if not loop or not targets:
+            raise ConnectionError("Client not connected." if controller_id is None else f"Controller {controller_id} not connected.")
+        data = control_bits.to_bytes(1, byteorder="big")
+        for protocol in targets:
+            loop.call_soon_threadsafe(protocol.transport.write, data)
+
+    def stop_server(self) -> None:
+        """Stop the server and close every controller connection."""
+        if not self._loop:
+            return
+
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+        self._thread = None
+        logger.info("Server stopped.")
+        self._context.set_message("Server stopped.")
+
+    async def _shutdown(self) -> None:
+        """Close the listening socket and all connections."""
+        self._server.close()
+        for protocol in list(self._controllers.values()):
+            protocol.transport.close()
+        await self._server.wait_closed()
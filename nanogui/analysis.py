@@ -0,0 +1,237 @@
+import csv
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import numpy as np
+from nanogui.events import DEFAULT_BASELINE_WINDOW, DEFAULT_END_SIGMA, DEFAULT_START_SIGMA, EventDetector
+from nanogui.recorder import CaptureReader
+
+DEFAULT_SPAN_FRAMES = 65536
+
+EVENT_TABLE_DTYPE = np.dtype([
+    ("file", np.int32),
+    ("channel", np.int8),
+    ("start", np.float64),
+    ("end", np.float64),
+    ("dwell", np.float64),
+    ("amplitude", np.float64),
+    ("peak", np.float64),
+    ("baseline", np.float64),
+])
+
+STATS_TABLE_DTYPE = np.dtype([
+    ("file", np.int32),
+    ("channel", np.int8),
+    ("samples", np.int64),
+    ("duration", np.float64),
+    ("mean", np.float64),
+    ("std", np.float64),
+    ("min", np.float64),
+    ("max", np.float64),
+    ("events", np.int64),
+    ("event_rate", np.float64),
+])
+
+@dataclass(frozen=True)
+class _Span:
+    """Range of frames of one capture analyzed by one worker."""
+    file: int
+    path: str
+    start: int
+    stop: int
+    baseline_window: int
+    start_sigma: float
+    end_sigma: float
+
+def _analyze_span(span: _Span) -> tuple:
+    """Detect events and accumulate channel statistics over one span of a capture.
+
+    The detector is first primed with the samples of the baseline window before
+    the span, then fed the span chunk by chunk, so the noise of every chunk is
+    estimated from the samples before it as on the live path. Chunks after the
+    span are read until no event starting in the span is still open. Only events
+    starting inside the span are kept. Sample numbers are used as the detector's
+    time axis, so the result does not depend on where the capture was split.
+    """
+    with CaptureReader(span.path, workers=1) as reader:
+        schema = reader.schema
+        detector = EventDetector(len(schema.channels), span.baseline_window, span.start_sigma, span.end_sigma)
+        begin, end = span.start * schema.samples, span.stop * schema.samples
+        margin = math.ceil(span.baseline_window / schema.samples)
+        first = max(span.start - margin, 0)
+        if first < span.start:
+            values, _ = schema.split(reader.frames(first, span.start))
+            detector.process(values, np.arange(first * schema.samples, begin))
+
+        first_frames = reader.index["first_frame"].astype(np.int64)
+        chunk = int(np.searchsorted(first_frames, span.start))
+        events = []
+        steps = []
+        count, sums, squares, minimum, maximum = 0, 0.0, 0.0, None, None
+        while chunk < len(first_frames):
+            chunk_start = int(first_frames[chunk]) * schema.samples
+            if chunk_start >= end:
+                open_starts = detector.open_starts
+                if not np.any((open_starts >= begin) & (open_starts < end)):
+                    break
+            values, counter = schema.split(reader.chunk(chunk))
+            values = values.astype(np.float64)
+            events.append(detector.process(values, np.arange(chunk_start, chunk_start + values.shape[1])))
+            if chunk_start < end:
+                count += values.shape[1]
+                sums = sums + values.sum(axis=1)
+                squares = squares + np.square(values).sum(axis=1)
+                minimum = values.min(axis=1) if minimum is None else np.minimum(minimum, values.min(axis=1))
+                maximum = values.max(axis=1) if maximum is None else np.maximum(maximum, values.max(axis=1))
+                steps.append(np.diff(counter.astype(np.int64)) % schema.time_period)
+            chunk += 1
+
+    events = np.concatenate(events)
+    events = events[(events["start"] >= begin) & (events["start"] < end)]
+    steps = np.concatenate(steps)
+    interval = float(np.median(steps)) if len(steps) else 0.0
+    return span.file, events, (count, sums, squares, minimum, maximum), interval
+
+def plan_spans(paths: list[str], span_frames: int = DEFAULT_SPAN_FRAMES, baseline_window: int = DEFAULT_BASELINE_WINDOW,
+               start_sigma: float = DEFAULT_START_SIGMA, end_sigma: float = DEFAULT_END_SIGMA) -> list[_Span]:
+    """Split captures into spans of whole chunks of about `span_frames` frames.
+
+    params:
+        paths (list[str]): Capture file paths.
+        span_frames (int): Target number of frames per span.
+        baseline_window (int): Number of samples in the detector's running baseline.
+        start_sigma (float): Drop in noise deviations that starts an event.
+        end_sigma (float): Drop in noise deviations below which an event ends.
+
+    returns:
+        list[_Span]: Spans covering every frame of every capture.
+    """
+    spans = []
+    for file, path in enumerate(paths):
+        with CaptureReader(path) as reader:
+            boundaries = reader.index["first_frame"].astype(np.int64)
+            total = len(reader)
+        start = 0
+        for boundary in list(boundaries[1:]) + [total]:
+            if boundary - start >= span_frames or boundary == total:
+                if boundary > start:
+                    spans.append(_Span(file, path, start, int(boundary), baseline_window, start_sigma, end_sigma))
+                start = int(boundary)
+    return spans
+
+def analyze(paths: list[str], workers: int | None = None, span_frames: int = DEFAULT_SPAN_FRAMES, baseline_window: int = DEFAULT_BASELINE_WINDOW,
+            start_sigma: float = DEFAULT_START_SIGMA, end_sigma: float = DEFAULT_END_SIGMA, progress=None) -> tuple[np.ndarray, np.ndarray]:
+    """Detect events and compute channel statistics over many captures in parallel.
+
+    Captures are split into spans of whole chunks that are analyzed on a process
+    pool, each worker memory-mapping only the chunks it needs, and the results are
+    merged into one event table and one statistics table.
+
+    params:
+        paths (list[str]): Capture file paths.
+        workers (int | None): Worker processes, defaults to one per CPU.
+        span_frames (int): Target number of frames per span.
+        baseline_window (int): Number of samples in the detector's running baseline.
+        start_sigma (float): Drop in noise deviations that starts an event.
+        end_sigma (float): Drop in noise deviations below which an event ends.
+        progress (Callable[[int, int], None] | None): Called with the number of finished and total spans.
+
+    returns:
+        tuple[np.ndarray, np.ndarray]: Events as an EVENT_TABLE_DTYPE array with times in seconds
+            from the start of each capture and dwell times in microseconds, and statistics of
+            every channel of every capture as a STATS_TABLE_DTYPE array.
+    """
+    spans = plan_spans(paths, span_frames, baseline_window, start_sigma, end_sigma)
+    events = [[] for _ in paths]
+    totals = [None] * len(paths)
+    intervals = [[] for _ in paths]
+
+    with ProcessPoolExecutor(workers) as executor:
+        for done, (file, span_events, stats, interval) in enumerate(executor.map(_analyze_span, spans), 1):
+            events[file].append(span_events)
+            intervals[file].append(interval)
+            if totals[file] is None:
+                totals[file] = list(stats)
+            else:
+                count, sums, squares, minimum, maximum = totals[file]
+                totals[file] = [count + stats[0], sums + stats[1], squares + stats[2], np.minimum(minimum, stats[3]), np.maximum(maximum, stats[4])]
+            if progress:
+                progress(done, len(spans))
+
+    event_rows = []
+    stats_rows = []
+    for file in range(len(paths)):
+        if totals[file] is None:
+            continue
+        # microseconds per sample from the time counter
+        interval = float(np.median(intervals[file]))
+        file_events = np.concatenate(events[file])
+        file_events = file_events[np.lexsort((file_events["channel"], file_events["start"]))]
+        table = np.zeros(len(file_events), dtype=EVENT_TABLE_DTYPE)
+        table["file"] = file
+        table["channel"] = file_events["channel"]
+        table["start"] = file_events["start"] * interval * 1e-6
+        table["end"] = file_events["end"] * interval * 1e-6
+        table["dwell"] = file_events["dwell"] * interval
+        for name in ("amplitude", "peak", "baseline"):
+            table[name] = file_events[name]
+        event_rows.append(table)
+
+        count, sums, squares, minimum, maximum = totals[file]
+        duration = count * interval * 1e-6
+        mean = sums / count
+        stats = np.zeros(len(sums), dtype=STATS_TABLE_DTYPE)
+        stats["file"] = file
+        stats["channel"] = np.arange(len(sums))
+        stats["samples"] = count
+        stats["duration"] = duration
+        stats["mean"] = mean
+        stats["std"] = np.sqrt(np.maximum(squares / count - mean ** 2, 0.0))
+        stats["min"] = minimum
+        stats["max"] = maximum
+        stats["events"] = np.bincount(file_events["channel"], minlength=len(sums))
+        stats["event_rate"] = stats["events"] / duration if duration > 0 else 0.0
+        stats_rows.append(stats)
+
+    event_table = np.concatenate(event_rows) if event_rows else np.empty(0, dtype=EVENT_TABLE_DTYPE)
+    stats_table = np.concatenate(stats_rows) if stats_rows else np.empty(0, dtype=STATS_TABLE_DTYPE)
+    return event_table, stats_table
+
+def _write_csv(path: str, table: np.ndarray, paths: list[str], channel_names: list[tuple[str, ...]]) -> None:
+    """Write a table to CSV with file paths and channel names instead of their numbers."""
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(table.dtype.names)
+        for row in table.tolist():
+            file_number, channel = row[0], row[1]
+            writer.writerow((paths[file_number], channel_names[file_number][channel]) + row[2:])
+
+def save_results(path: str, events: np.ndarray, stats: np.ndarray, paths: list[str]) -> list[str]:
+    """Save analysis results as NPZ, or as CSV files when the path does not end in .npz.
+
+    A CSV path receives the events and the statistics go to the same name
+    suffixed with -stats.
+
+    params:
+        path (str): Output path.
+        events (np.ndarray): Event table from analyze.
+        stats (np.ndarray): Statistics table from analyze.
+        paths (list[str]): Capture file paths the tables refer to by number.
+
+    returns:
+        list[str]: Written file paths.
+    """
+    if path.endswith(".npz"):
+        np.savez(path, events=events, stats=stats, files=np.array(paths))
+        return [path]
+
+    channel_names = []
+    for capture in paths:
+        with CaptureReader(capture) as reader:
+            channel_names.append(reader.schema.channels)
+    stem, extension = os.path.splitext(path)
+    stats_path = f"{stem}-stats{extension or '.csv'}"
+    _write_csv(path, events, paths, channel_names)
+    _write_csv(stats_path, stats, paths, channel_names)
+    return [path, stats_path]
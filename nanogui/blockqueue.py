@@ -0,0 +1,106 @@
+import collections
+import threading
+import numpy as np
+from nanogui.metrics import get_metrics
+from nanogui.sinks import DataSink
+
+DEFAULT_QUEUE_CAPACITY = 1 << 16
+DEFAULT_DECIMATION = 4
+QUEUE_POLICIES = ("block", "drop_oldest", "decimate")
+
+class BlockQueue(DataSink):
+    """Bounded single-producer/single-consumer queue of frame blocks.
+
+    The receive thread puts blocks as they arrive and the consumer takes
+    everything queued as one concatenated block. When the queue is full the
+    overflow policy decides what happens:
+
+    - "block": the producer waits for space, pushing back on the controller through TCP.
+    - "drop_oldest": the oldest queued blocks are discarded.
+    - "decimate": only every `decimation`-th frame of new blocks is kept, then the oldest blocks are discarded if still needed.
+
+    params:
+        capacity (int): Maximum number of queued frames.
+        policy (str): Overflow policy.
+        decimation (int): Frame stride kept by the "decimate" policy.
+    """
+    def __init__(self, capacity: int = DEFAULT_QUEUE_CAPACITY, policy: str = "drop_oldest", decimation: int = DEFAULT_DECIMATION) -> None:
+        if policy not in QUEUE_POLICIES:
+            raise ValueError(f"Queue policy must be one of {', '.join(QUEUE_POLICIES)}.")
+        if capacity <= 0:
+            raise ValueError("Queue capacity must be positive.")
+        self._capacity = capacity
+        self._policy = policy
+        self._decimation = decimation
+        self._blocks = collections.deque()
+        self._frames = 0
+        self._closed = False
+        self._space = threading.Condition()
+
+        metrics = get_metrics()
+        self._depth = metrics.gauge("queue_depth")
+        self._dropped = metrics.counter("frames_dropped")
+        self.dropped = 0
+
+    @property
+    def depth(self) -> int:
+        """Number of queued frames."""
+        return self._frames
+
+    def write(self, frames: np.ndarray, controller_id: int = 0) -> None:
+        self.put(frames)
+
+    def put(self, frames: np.ndarray) -> None:
+        """Queue a block of frames, applying the overflow policy if the queue is full.
+
+        params:
+            frames (np.ndarray): Frames with shape (n,). Must not be modified afterwards.
+        """
+        if len(frames) > self._capacity:
+            self._drop(len(frames) - self._capacity)
+            frames = frames[-self._capacity:]
+
+        with self._space:
+            if self._policy == "block":
+                while self._frames + len(frames) > self._capacity and not self._closed:
+                    self._space.wait(0.1)
+            elif self._policy == "decimate" and self._frames + len(frames) > self._capacity:
+                kept = frames[::self._decimation]
+                self._drop(len(frames) - len(kept))
+                frames = kept
+
+            while self._blocks and self._frames + len(frames) > self._capacity:
+                oldest = self._blocks.popleft()
+                self._frames -= len(oldest)
+                self._drop(len(oldest))
+
+            self._blocks.append(frames)
+            self._frames += len(frames)
+            self._depth.set(self._frames)
+
+    def get_all(self) -> np.ndarray | None:
+        """Take every queued frame.
+
+        returns:
+            np.ndarray | None: All queued frames as one block, or None if the queue is empty.
+        """
+        with self._space:
+            if not self._blocks:
+                return None
+            blocks = list(self._blocks)
+            self._blocks.clear()
+            self._frames = 0
+            self._depth.set(0)
+            self._space.notify()
+        return blocks[0] if len(blocks) == 1 else np.concatenate(blocks)
+
+    def close(self) -> None:
+        """Release a producer waiting for space."""
+        with self._space:
+            self._closed = True
+            self._space.notify_all()
+
+    def _drop(self, n_frames: int) -> None:
+        """Count dropped frames."""
+        self.dropped += n_frames
+        self._dropped.inc(n_frames)
@@ -0,0 +1,145 @@
+import numpy as np
+from nanogui.schema import DEFAULT_SCHEMA
+
+DEFAULT_CAPACITY = 1 << 20
+
+def capacity_for(seconds: float, sample_rate: float) -> int:
+    """Get the number of samples needed to hold a duration of data.
+
+    params:
+        seconds (float): Duration to keep.
+        sample_rate (float): Samples per second per channel.
+
+    returns:
+        int: Capacity in samples.
+    """
+    capacity = int(np.ceil(seconds * sample_rate))
+    if capacity <= 0:
+        raise ValueError("Buffer duration and sample rate must be positive.")
+    return capacity
+
+class RingBuffer:
+    """Fixed-capacity sample history for all channels with one shared time axis.
+
+    Every sample is written twice, at its slot and at slot + capacity, so the most
+    recent samples are always a contiguous region of the backing arrays and can be
+    returned as views without copying.
+
+    params:
+        capacity (int): Maximum number of samples kept per channel.
+        channels (int): Number of analog channels.
+        dtype (np.dtype): Sample type.
+    """
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, channels: int = len(DEFAULT_SCHEMA.channels), dtype: np.dtype = DEFAULT_SCHEMA.sample_dtype) -> None:
+        if capacity <= 0:
+            raise ValueError("Buffer capacity must be positive.")
+        self._capacity = capacity
+        self._values = np.zeros((channels, 2 * capacity), dtype=dtype)
+        self._time = np.zeros(2 * capacity, dtype=np.int64)
+        self._head = 0
+        self._size = 0
+
+    @classmethod
+    def from_duration(cls, seconds: float, sample_rate: float, channels: int = len(DEFAULT_SCHEMA.channels), dtype: np.dtype = DEFAULT_SCHEMA.sample_dtype) -> "RingBuffer":
+        """Create a buffer holding a duration of data.
+
+        params:
+            seconds (float): Duration to keep.
+            sample_rate (float): Samples per second per channel.
+            channels (int): Number of analog channels.
+            dtype (np.dtype): Sample type.
+
+        returns:
+            RingBuffer: The new buffer.
+        """
+        return cls(capacity_for(seconds, sample_rate), channels, dtype)
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of samples kept per channel."""
+        return self._capacity
+
+    @property
+    def channels(self) -> int:
+        """Number of analog channels."""
+        return self._values.shape[0]
+
+    @property
+    def dtype(self) -> np.dtype:
+        """Sample type."""
+        return self._values.dtype
+
+    @property
+    def size(self) -> int:
+        """Number of samples currently held per channel."""
+        return self._size
+
+    def append(self, values: np.ndarray, time: np.ndarray) -> None:
+        """Append a block of samples.
+
+        params:
+            values (np.ndarray): Samples with shape (channels, n).
+            time (np.ndarray): Timestamps with shape (n,).
+        """
+        n = len(time)
+        if n == 0:
+            return
+        if n > self._capacity:
+            values = values[:, -self._capacity:]
+            time = time[-self._capacity:]
+            n = self._capacity
+
+        self._write(self._values, values, n)
+        self._write(self._time, time, n)
+        self._head = (self._head + n) % self._capacity
+        self._size = min(self._size + n, self._capacity)
+
+    def _write(self, target: np.ndarray, block: np.ndarray, n: int) -> None:
+        """Write a block at the head and mirror it into the other half."""
+        head = self._head
+        capacity = self._capacity
+        end = head + n
+        target[..., head:end] = block
+
+        split = min(end, capacity)
+        if split > head:
+            target[..., head + capacity:split + capacity] = target[..., head:split]
+        if end > capacity:
+            target[..., :end - capacity] = target[..., capacity:end]
+
+    def latest(self, n: int | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """Get views of the most recent samples.
+
+        The views alias the buffer and are overwritten by later appends.
+
+        params:
+            n (int | None): Number of samples, defaults to everything held.
+
+        returns:
+            tuple[np.ndarray, np.ndarray]: Time with shape (n,) and values with shape (channels, n).
+        """
+        n = self._size if n is None else min(n, self._size)
+        end = self._head + self._capacity
+        return self._time[end - n:end], self._values[:, end - n:end]
+
+    def window(self, start: float, stop: float) -> tuple[np.ndarray, np.ndarray]:
+        """Get views of the samples within a time range.
+
+        Requires a non-decreasing time axis and finds the range by binary search.
+
+        params:
+            start (float): Start time, inclusive.
+            stop (float): End time, inclusive.
+
+        returns:
+            tuple[np.ndarray, np.ndarray]: Time with shape (n,) and values with shape (channels, n).
+        """
+        time, values = self.latest()
+        first = np.searchsorted(time, start, side="left")
+        last = np.searchsorted(time, stop, side="right")
+        return time[first:last], values[:, first:last]
+
+    def clear(self) -> None:
+        """Discard all samples."""
+        self._head = 0
+        self._size = 0
@@ -0,0 +1,158 @@
+import argparse
+from nanogui.log import setup_logging, shutdown_logging
+
+def _parse_speed(value: str) -> float | None:
+    """Parse a replay speed factor, where "max" means as fast as possible."""
+    if value == "max":
+        return None
+    speed = float(value)
+    if speed <= 0:
+        raise argparse.ArgumentTypeError("speed must be positive or 'max'")
+    return speed
+
+def _parse_fps(value: str) -> float:
+    """Parse a graph redraw rate."""
+    fps = float(value)
+    if fps <= 0:
+        raise argparse.ArgumentTypeError("render rate must be positive")
+    return fps
+
+def _replay(args: argparse.Namespace) -> None:
+    """Run the replay command."""
+    from nanogui.replay import ReplayClient
+
+    client = ReplayClient(args.file, args.host, args.port, speed=args.speed, batch_frames=args.batch)
+    try:
+        client.run()
+    except KeyboardInterrupt:
+        client.close()
+    except (OSError, ValueError) as e:
+        raise SystemExit(str(e))
+
+def _analyze(args: argparse.Namespace) -> None:
+    """Run the analyze command."""
+    import time
+    from nanogui.analysis import analyze, save_results
+
+    def report(done: int, total: int) -> None:
+        print(f"\rAnalyzed {done}/{total} spans", end="", flush=True)
+
+    start = time.perf_counter()
+    try:
+        events, stats = analyze(args.files, workers=args.workers, span_frames=args.span_frames, baseline_window=args.baseline_window,
+                                start_sigma=args.start_sigma, end_sigma=args.end_sigma, progress=report)
+        written = save_results(args.output, events, stats, args.files)
+    except (OSError, ValueError) as e:
+        raise SystemExit(str(e))
+    print(f"\nFound {len(events)} events in {len(args.files)} captures in {time.perf_counter() - start:.1f} s, wrote {', '.join(written)}")
+
+def _load_schema(path: str | None):
+    """Load the frame schema file given on the command line, if any."""
+    if not path:
+        return None
+    from nanogui.schema import FrameSchema
+
+    try:
+        return FrameSchema.load(path)
+    except (OSError, ValueError, TypeError) as e:
+        raise SystemExit(f"Invalid frame schema {path}: {e}")
+
+def _history_capacity(args: argparse.Namespace) -> int:
+    """Get the channel history capacity in samples given on the command line."""
+    from nanogui.buffer import DEFAULT_CAPACITY, capacity_for
+
+    if args.history_samples is not None:
+        if args.history_samples <= 0:
+            raise SystemExit("--history-samples must be positive.")
+        return args.history_samples
+    if args.history_seconds is not None:
+        try:
+            return capacity_for(args.history_seconds, args.sample_rate)
+        except ValueError as e:
+            raise SystemExit(str(e))
+    return DEFAULT_CAPACITY
+
+def _headless(args: argparse.Namespace) -> None:
+    """Run the server without a GUI."""
+    from nanogui.headless import run_headless
+
+    try:
+        run_headless(args.host, args.port, record=args.record, stats_interval=args.stats_interval or None, multi=args.multi, metrics_file=args.metrics_file, schema=_load_schema(args.schema), compress=args.compress)
+    except OSError as e:
+        raise SystemExit(str(e))
+
+def _run(args: argparse.Namespace) -> None:
+    """Run the command, headless server or GUI selected on the command line."""
+    if args.command:
+        args.handler(args)
+    elif args.headless:
+        _headless(args)
+    else:
+        from nanogui.gui import run
+        run(metrics_file=args.metrics_file, queue_policy=args.queue_policy, acquisition_process=args.acquisition_process, schema=_load_schema(args.schema), compress=args.compress,
+            buffer_capacity=_history_capacity(args), render_fps=args.render_fps)
+
+def main(argv: list[str] | None = None) -> None:
+    """Entry point for the nanogui command.
+
+    PySide6 and pyqtgraph are only imported when the GUI is started.
+    """
+    parser = argparse.ArgumentParser(prog="nanogui", description="Quantum-NanoElectroPore controller GUI.")
+    parser.add_argument("--headless", action="store_true", help="acquire without a GUI")
+    parser.add_argument("--metrics-file", metavar="FILE", help="append pipeline metrics to a JSON lines file every second")
+    parser.add_argument("--queue-policy", choices=("block", "drop_oldest", "decimate"), default="drop_oldest", help="what to do when the GUI falls behind (default: drop_oldest)")
+    parser.add_argument("--schema", metavar="FILE", help="JSON frame schema describing the controller's frame layout")
+    history = parser.add_mutually_exclusive_group()
+    history.add_argument("--history-samples", type=int, metavar="N", help="samples of history kept per channel (GUI only, default: 1048576)")
+    history.add_argument("--history-seconds", type=float, metavar="SECONDS", help="seconds of history kept per channel at --sample-rate (GUI only)")
+    parser.add_argument("--render-fps", type=_parse_fps, default=30.0, help="maximum graph redraws per second (GUI only, default: 30)")
+    parser.add_argument("--sample-rate", type=float, default=100_000, help="samples per second per channel used with --history-seconds (default: 100000)")
+    parser.add_argument("--acquisition-process", action="store_true", help="receive and decode frames in a separate process (GUI only)")
+    parser.add_argument("--profile", action="store_true", help="time the receive and render stages and print them on exit")
+    parser.add_argument("--profile-output", metavar="FILE", help="with --profile, also write a cProfile trace to FILE on exit")
+    parser.add_argument("--compress", choices=("zlib", "lzma"), help="compress recorded capture chunks (default: raw frames)")
+    parser.add_argument("--log-file", metavar="FILE", help="also write log messages to FILE, rotated at 5 MB with 3 backups kept")
+    parser.add_argument("--log-level", choices=("DEBUG", "INFO", "WARNING", "ERROR"), default="INFO", help="lowest level of log messages written (default: INFO)")
+    headless = parser.add_argument_group("headless options")
+    headless.add_argument("--host", default="127.0.0.1", help="host to listen on (default: 127.0.0.1)")
+    headless.add_argument("--port", type=int, default=8888, help="port to listen on (default: 8888)")
+    headless.add_argument("--multi", action="store_true", help="accept many controllers on one event loop")
+    headless.add_argument("--record", metavar="FILE", help="record received frames to a capture file, one per controller with --multi")
+    headless.add_argument("--stats-interval", type=float, default=1.0, help="seconds between frame rate reports, 0 to disable (default: 1)")
+    commands = parser.add_subparsers(dest="command")
+
+    replay = commands.add_parser("replay", help="stream a capture file to a running server")
+    replay.add_argument("file", help="capture file to replay")
+    replay.add_argument("--host", default="127.0.0.1", help="server host (default: 127.0.0.1)")
+    replay.add_argument("--port", type=int, default=8888, help="server port (default: 8888)")
+    replay.add_argument("--speed", type=_parse_speed, default=1.0, help="playback speed factor, or 'max' for as fast as possible (default: 1)")
+    replay.add_argument("--batch", type=int, default=64, help="frames per send (default: 64)")
+    replay.set_defaults(handler=_replay)
+
+    analyze = commands.add_parser("analyze", help="detect events and compute channel statistics over capture files")
+    analyze.add_argument("files", nargs="+", help="capture files to analyze")
+    analyze.add_argument("-o", "--output", required=True, help="output file, .npz for NumPy tables, otherwise CSV with statistics in <name>-stats.csv")
+    analyze.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    analyze.add_argument("--span-frames", type=int, default=65536, help="frames per unit of work (default: 65536)")
+    analyze.add_argument("--baseline-window", type=int, default=8192, help="samples in the running baseline (default: 8192)")
+    analyze.add_argument("--start-sigma", type=float, default=5.0, help="noise deviations below the baseline that start an event (default: 5)")
+    analyze.add_argument("--end-sigma", type=float, default=1.0, help="noise deviations below the baseline that end an event (default: 1)")
+    analyze.set_defaults(handler=_analyze)
+
+    args = parser.parse_args(argv)
+    try:
+        setup_logging(args.log_file, args.log_level)
+    except OSError as e:
+        raise SystemExit(f"Cannot open log file {args.log_file}: {e}")
+    if args.profile:
+        from nanogui import profiling
+        profiling.enable(trace=args.profile_output is not None)
+    try:
+        _run(args)
+    finally:
+        if args.profile:
+            profiling.finish(args.profile_output)
+        shutdown_logging()
+
+if __name__ == "__main__":
+    main()
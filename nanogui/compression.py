@@ -0,0 +1,85 @@
+import lzma
+import zlib
+import numpy as np
+from nanogui.schema import FrameSchema
+
+CODECS = ("zlib", "lzma")
+DEFAULT_LEVELS = {"zlib": 6, "lzma": 1}
+
+class ChunkCodec:
+    """Compress chunks of frames so each chunk can be decoded on its own.
+
+    Every field is flattened into its samples in time order and delta encoded,
+    so slowly varying signals and the time counter become small numbers. The
+    deltas are zigzag encoded so small negative steps stay small, and their bytes
+    are shuffled so the mostly zero high bytes of every sample are stored
+    together, which zlib and lzma compress far better than interleaved words.
+    Deltas wrap in the field's unsigned type, so the wrapping time counter and
+    full-scale steps round-trip exactly.
+
+    params:
+        schema (FrameSchema): Layout of the frames.
+        codec (str): Compressor, "zlib" or "lzma".
+        level (int | None): Compression level, or zlib level / lzma preset default.
+    """
+    def __init__(self, schema: FrameSchema, codec: str = "zlib", level: int | None = None) -> None:
+        if codec not in CODECS:
+            raise ValueError(f"Unknown codec {codec}, expected one of {', '.join(CODECS)}.")
+        self.schema = schema
+        self.codec = codec
+        self.level = DEFAULT_LEVELS[codec] if level is None else level
+        self._fields = list(schema.channels) + [schema.time_field]
+
+    def encode(self, frames: np.ndarray) -> bytes:
+        """Compress a chunk of frames.
+
+        params:
+            frames (np.ndarray): Frames with shape (n,) in the schema's `dtype` or `wire_dtype`.
+
+        returns:
+            bytes: Compressed chunk.
+        """
+        parts = []
+        for name in self._fields:
+            values = np.ascontiguousarray(frames[name], dtype=self.schema.dtype[name].base).reshape(-1)
+            bits = values.dtype.itemsize * 8
+            unsigned = values.view(f"u{values.dtype.itemsize}")
+            deltas = np.empty_like(unsigned)
+            deltas[:1] = unsigned[:1]
+            np.subtract(unsigned[1:], unsigned[:-1], out=deltas[1:])
+            signed = deltas.view(f"i{values.dtype.itemsize}")
+            zigzag = (signed << 1) ^ (signed >> (bits - 1))
+            # byte shuffle: all first bytes, then all second bytes, ...
+            parts.append(zigzag.view(np.uint8).reshape(-1, values.dtype.itemsize).T.tobytes())
+        data = b"".join(parts)
+        if self.codec == "zlib":
+            return zlib.compress(data, self.level)
+        return lzma.compress(data, preset=self.level)
+
+    def decode(self, data, n_frames: int) -> np.ndarray:
+        """Decompress a chunk of frames.
+
+        params:
+            data: Compressed chunk bytes.
+            n_frames (int): Number of frames in the chunk.
+
+        returns:
+            np.ndarray: Frames with shape (n_frames,) in the schema's native `dtype`.
+        """
+        raw = zlib.decompress(data) if self.codec == "zlib" else lzma.decompress(data)
+        frames = np.empty(n_frames, dtype=self.schema.dtype)
+        offset = 0
+        for name in self._fields:
+            field = self.schema.dtype[name]
+            itemsize = field.base.itemsize
+            count = n_frames * self.schema.samples
+            size = count * itemsize
+            if offset + size > len(raw):
+                raise ValueError("Compressed chunk is shorter than its frame count.")
+            shuffled = np.frombuffer(raw, dtype=np.uint8, count=size, offset=offset)
+            zigzag = shuffled.reshape(itemsize, count).T.copy().view(f"u{itemsize}").reshape(count)
+            deltas = (zigzag >> 1) ^ (-(zigzag & 1)).astype(zigzag.dtype)
+            values = np.cumsum(deltas, dtype=zigzag.dtype)
+            frames[name] = values.view(field.base).reshape(n_frames, self.schema.samples)
+            offset += size
+        return frames
@@ -1,16 +1,23 @@
-from PySide6.QtCore import QObject, Signal
+import threading
+import time
+from collections import deque
+from nanogui.schema import DEFAULT_SCHEMA, FrameSchema
+
+MESSAGE_WINDOW = 1.0
+
 _context_instance = None
 
-class ApplicationContext(QObject):
+class ApplicationContext:
     """Application context for storing global state."""
-    message_changed = Signal(str)
-
     def __init__(self) -> None:
-        super().__init__()
         self._host = None
         self._port = None
         self._control_bits = 0b00000000
+        self._schema = DEFAULT_SCHEMA
         self._message = "Server stopped."
+        self._message_serial = 0
+        self._message_times = deque()
+        self._message_lock = threading.Lock()
 
     def get_host(self) -> str:
         """Get the host address.
@@ -65,22 +72,78 @@ class ApplicationContext(QObject):
         
         self._control_bits = int(''.join(map(str, bits)), 2)
 
+    def get_schema(self) -> FrameSchema:
+        """Get the frame schema.
+
+        returns:
+            FrameSchema: Layout of the frames sent by the controller.
+        """
+        return self._schema
+
+    def set_schema(self, schema: FrameSchema) -> None:
+        """Set the frame schema.
+
+        params:
+            schema (FrameSchema): Layout of the frames sent by the controller.
+        """
+        self._schema = schema
+
     def get_message(self) -> str:
         """Get the current context message.
-        
+
+        A message set repeatedly within the last second is suffixed with the
+        number of times it was set, e.g. "Client connection reset. ×312 in last 1 s".
+
         returns:
             str: Context message.
         """
-        return self._message
-    
+        with self._message_lock:
+            return self._format_message()
+
     def set_message(self, message: str) -> None:
         """Set the context message.
-        
+
+        Cheap enough to call from the receive threads for every event: the
+        message is only stored, and readers poll it with `poll_message`.
+
         params:
             message (str): The message to set.
         """
-        self._message = message
-        self.message_changed.emit(message)
+        now = time.monotonic()
+        with self._message_lock:
+            if message != self._message:
+                self._message = message
+                self._message_times.clear()
+            times = self._message_times
+            times.append(now)
+            while now - times[0] > MESSAGE_WINDOW:
+                times.popleft()
+            self._message_serial += 1
+
+    def poll_message(self, serial: int) -> tuple[int, str | None]:
+        """Get the context message if it was set since a previous poll.
+
+        Readers such as the status bar poll at their own pace, so a storm of
+        messages costs them one update per poll.
+
+        params:
+            serial (int): Serial returned by the previous poll, or 0 for the first one.
+
+        returns:
+            tuple[int, str | None]: Serial to pass to the next poll, and the message
+                or None if it was not set since `serial`.
+        """
+        with self._message_lock:
+            if self._message_serial == serial:
+                return serial, None
+            return self._message_serial, self._format_message()
+
+    def _format_message(self) -> str:
+        """Get the current message with its repeat count."""
+        count = len(self._message_times)
+        if count <= 1:
+            return self._message
+        return f"{self._message} ×{count} in last {MESSAGE_WINDOW:g} s"
 
 def get_app_context() -> ApplicationContext:
     """Get the application context.
@@ -0,0 +1,151 @@
+import numpy as np
+from nanogui.buffer import RingBuffer
+
+DEFAULT_FACTOR = 4
+MIN_LEVEL_BINS = 1024
+
+class _Level:
+    """One level of the pyramid, holding min/max bins of the level below.
+
+    params:
+        capacity (int): Number of bins kept.
+        channels (int): Number of analog channels.
+        bin_size (int): Number of raw samples per bin.
+        factor (int): Number of lower-level bins merged into one bin.
+        dtype (np.dtype): Sample type.
+    """
+    def __init__(self, capacity: int, channels: int, bin_size: int, factor: int, dtype: np.dtype) -> None:
+        self.bin_size = bin_size
+        self.buffer = RingBuffer(capacity, 2 * channels, dtype)
+        self._channels = channels
+        self._factor = factor
+        self._carry_low = np.empty((channels, 0), dtype=dtype)
+        self._carry_high = np.empty((channels, 0), dtype=dtype)
+        self._carry_time = np.empty(0, dtype=np.int64)
+
+    def push(self, low: np.ndarray, high: np.ndarray, time: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Merge lower-level bins into this level.
+
+        Bins that do not complete a full group are carried into the next push.
+
+        params:
+            low (np.ndarray): Lower-level minimums with shape (channels, n).
+            high (np.ndarray): Lower-level maximums with shape (channels, n).
+            time (np.ndarray): Lower-level bin start times with shape (n,).
+
+        returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]: The completed bins of this level.
+        """
+        if len(self._carry_time):
+            low = np.concatenate((self._carry_low, low), axis=1)
+            high = np.concatenate((self._carry_high, high), axis=1)
+            time = np.concatenate((self._carry_time, time))
+
+        n_bins = len(time) // self._factor
+        used = n_bins * self._factor
+        bin_low = low[:, :used].reshape(self._channels, n_bins, self._factor).min(axis=2)
+        bin_high = high[:, :used].reshape(self._channels, n_bins, self._factor).max(axis=2)
+        bin_time = time[:used:self._factor]
+
+        self._carry_low = low[:, used:].copy()
+        self._carry_high = high[:, used:].copy()
+        self._carry_time = time[used:].copy()
+
+        self.buffer.append(np.concatenate((bin_low, bin_high)), bin_time)
+        return bin_low, bin_high, bin_time
+
+    def clear(self) -> None:
+        """Discard all bins and carried samples."""
+        self.buffer.clear()
+        self._carry_low = self._carry_low[:, :0]
+        self._carry_high = self._carry_high[:, :0]
+        self._carry_time = self._carry_time[:0]
+
+class MinMaxPyramid:
+    """Multi-resolution min/max summary of a ring buffer for plotting.
+
+    Level 0 is the raw buffer. Each further level keeps the minimum and maximum of
+    `factor` bins of the level below, so short spikes survive at every zoom level.
+    Levels are extended incrementally as blocks are appended. The time axis must
+    be non-decreasing, so visible ranges are found by binary search.
+
+    params:
+        buffer (RingBuffer): Raw sample buffer, appended to through the pyramid.
+        factor (int): Number of bins merged per level.
+    """
+    def __init__(self, buffer: RingBuffer, factor: int = DEFAULT_FACTOR) -> None:
+        if factor < 2:
+            raise ValueError("Decimation factor must be at least 2.")
+        self._buffer = buffer
+        self._channels = buffer.channels
+        self._levels = []
+
+        bin_size = factor
+        while buffer.capacity // bin_size >= MIN_LEVEL_BINS:
+            self._levels.append(_Level(buffer.capacity // bin_size, self._channels, bin_size, factor, buffer.dtype))
+            bin_size *= factor
+
+    @property
+    def buffer(self) -> RingBuffer:
+        """Raw sample buffer."""
+        return self._buffer
+
+    def append(self, values: np.ndarray, time: np.ndarray) -> None:
+        """Append a block of samples to the buffer and every level.
+
+        params:
+            values (np.ndarray): Samples with shape (channels, n).
+            time (np.ndarray): Timestamps with shape (n,).
+        """
+        self._buffer.append(values, time)
+
+        low, high = values, values
+        for level in self._levels:
+            if len(time) == 0:
+                break
+            low, high, time = level.push(low, high, time)
+
+    def clear(self) -> None:
+        """Discard all samples."""
+        self._buffer.clear()
+        for level in self._levels:
+            level.clear()
+
+    def view(self, channel: int, max_bins: int, x_range: tuple[float, float] | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """Get the points to plot for a channel.
+
+        Picks the finest level that needs at most `max_bins` bins to cover the
+        visible samples. Decimated levels are returned as interleaved min/max pairs.
+
+        params:
+            channel (int): Channel index.
+            max_bins (int): Maximum number of bins to return, usually the viewport width in pixels.
+            x_range (tuple[float, float] | None): Visible time range, or None for the whole history.
+
+        returns:
+            tuple[np.ndarray, np.ndarray]: X and Y data.
+        """
+        max_bins = max(1, max_bins)
+        if x_range is None:
+            visible = self._buffer.size
+        else:
+            visible = len(self._buffer.window(*x_range)[0])
+
+        level = None
+        if visible > max_bins:
+            for level in self._levels:
+                if visible // level.bin_size <= max_bins:
+                    break
+
+        if level is None:
+            time, values = self._buffer.latest() if x_range is None else self._buffer.window(*x_range)
+            return time, values[channel]
+
+        time, values = level.buffer.latest() if x_range is None else level.buffer.window(*x_range)
+        low, high = values[channel], values[self._channels + channel]
+
+        x_data = np.repeat(time, 2)
+        y_data = np.empty(2 * len(time), dtype=low.dtype)
+        y_data[0::2] = low
+        y_data[1::2] = high
+        return x_data, y_data
@@ -0,0 +1,4 @@
+from nanogui.emulator.client import EmulatorClient
+from nanogui.emulator.signal import SignalGenerator
+
+__all__ = ["EmulatorClient", "SignalGenerator"]
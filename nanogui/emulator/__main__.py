@@ -0,0 +1,35 @@
+import argparse
+from nanogui.emulator import EmulatorClient, SignalGenerator
+from nanogui.schema import DEFAULT_SCHEMA, FrameSchema
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the emulator against a server."""
+    parser = argparse.ArgumentParser(prog="python -m nanogui.emulator", description="Synthetic Quantum-NanoElectroPore controller.")
+    parser.add_argument("--host", default="127.0.0.1", help="server host (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8888, help="server port (default: 8888)")
+    parser.add_argument("--rate", type=int, default=100_000, help="samples per second per channel (default: 100000)")
+    parser.add_argument("--noise", type=float, default=20.0, help="noise standard deviation (default: 20)")
+    parser.add_argument("--event-rate", type=float, default=5.0, help="pore events per second per channel (default: 5)")
+    parser.add_argument("--duration", type=float, default=None, help="seconds to stream for (default: until interrupted)")
+    parser.add_argument("--schema", metavar="FILE", help="JSON frame schema of the generated frames (default: 4 channels of 16 samples)")
+    parser.add_argument("--protocol", type=int, choices=(1, 2), default=1, help="wire protocol version (default: 1)")
+    parser.add_argument("--batch", type=int, default=32, help="frames per send, or per message with protocol 2 (default: 32)")
+    parser.add_argument("--unpaced", action="store_true", help="send as fast as possible")
+    args = parser.parse_args(argv)
+
+    schema = FrameSchema.load(args.schema) if args.schema else DEFAULT_SCHEMA
+    generator = SignalGenerator(sample_rate=args.rate, noise=args.noise, event_rate=args.event_rate, schema=schema)
+    client = EmulatorClient(args.host, args.port, generator, batch_frames=args.batch, paced=not args.unpaced, protocol=args.protocol)
+    try:
+        client.connect()
+    except ConnectionRefusedError:
+        raise SystemExit(f"Could not connect to server at {args.host}:{args.port}. Is the server running?")
+    print(f"Connected to server at {args.host}:{args.port}")
+    try:
+        client.run(args.duration)
+    except KeyboardInterrupt:
+        client.close()
+    print(f"Sent {client.frames_sent} frames with {generator.events_injected} events.")
+
+if __name__ == "__main__":
+    main()
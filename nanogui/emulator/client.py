@@ -0,0 +1,114 @@
+import socket
+import threading
+import time
+from nanogui.emulator.signal import SignalGenerator
+from nanogui.framing import encode_message
+
+DEFAULT_BATCH_FRAMES = 32
+
+class EmulatorClient:
+    """Synthetic controller that streams generated frames to the server.
+
+    Frames are paced at the generator's frame rate, or sent as fast as possible
+    when `paced` is False. With protocol 2 each batch is sent as one sequenced v2
+    message instead of bare frames. Control bits received from the server are applied to
+    the generator, so they show up in the following frames.
+
+    params:
+        host (str): Server host address.
+        port (int): Server port number.
+        generator (SignalGenerator): Frame source.
+        batch_frames (int): Number of frames per send.
+        paced (bool): Whether to send at the generator's frame rate.
+        protocol (int): Wire protocol version, 1 or 2.
+    """
+    def __init__(self, host: str, port: int, generator: SignalGenerator | None = None, batch_frames: int = DEFAULT_BATCH_FRAMES, paced: bool = True, protocol: int = 1) -> None:
+        if protocol not in (1, 2):
+            raise ValueError("Protocol must be 1 or 2.")
+        self._host = host
+        self._port = port
+        self.generator = generator or SignalGenerator()
+        self._batch_frames = batch_frames
+        self._paced = paced
+        self._protocol = protocol
+        self._sequence = 0
+        self._socket = None
+        self._listener = None
+        self._running = False
+        self.frames_sent = 0
+        self.control_changes = []
+
+    def connect(self) -> None:
+        """Connect to the server and start listening for control bits."""
+        self._socket = socket.create_connection((self._host, self._port))
+        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._running = True
+        self._listener = threading.Thread(target=self._listen_for_control_bits, args=(self._socket,), daemon=True)
+        self._listener.start()
+
+    def run(self, duration: float | None = None) -> None:
+        """Stream frames until stopped, disconnected or `duration` seconds have passed.
+
+        params:
+            duration (float | None): Seconds to stream for, or None to stream until stopped.
+        """
+        if not self._socket:
+            self.connect()
+
+        interval = self._batch_frames / self.generator.frame_rate
+        start = time.perf_counter()
+        try:
+            while self._running:
+                elapsed = time.perf_counter() - start
+                if duration is not None and elapsed >= duration:
+                    break
+                if self._paced:
+                    delay = self.frames_sent / self.generator.frame_rate - elapsed
+                    if delay > 0:
+                        time.sleep(min(delay, interval))
+                        continue
+
+                frames = self.generator.frames(self._batch_frames)
+                if self._protocol == 2:
+                    self._socket.sendall(encode_message(frames, self._sequence, self.generator.schema))
+                    self._sequence += 1
+                else:
+                    self._socket.sendall(self.generator.schema.encode(frames))
+                self.frames_sent += self._batch_frames
+        except OSError as e:
+            if self._running:
+                print(f"Error sending frames: {e}")
+        finally:
+            self.close()
+
+    def _listen_for_control_bits(self, sock: socket.socket) -> None:
+        """Apply control bits sent by the server to the generator."""
+        while self._running:
+            try:
+                response = sock.recv(1)
+            except OSError:
+                break
+            if not response:
+                self._running = False
+                break
+            self.generator.set_control_bits(response[0])
+            self.control_changes.append((time.perf_counter(), response[0]))
+
+    def stop(self) -> None:
+        """Stop streaming."""
+        self._running = False
+
+    def close(self) -> None:
+        """Close the connection."""
+        self._running = False
+        if self._socket:
+            try:
+                # wake the listener blocked in recv, so the connection is closed now
+                self._socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            if self._listener and self._listener is not threading.current_thread():
+                self._listener.join()
+            self._listener = None
+            self._socket.close()
+            self._socket = None
@@ -0,0 +1,111 @@
+import numpy as np
+from nanogui.schema import DEFAULT_SCHEMA, FrameSchema
+
+DEFAULT_SAMPLE_RATE = 100_000
+DEFAULT_BASELINE = 1000
+DEFAULT_NOISE = 20.0
+DEFAULT_EVENT_RATE = 5.0
+DEFAULT_EVENT_DEPTH = 300
+DEFAULT_EVENT_DWELL = 0.001
+DEFAULT_CONTROL_GAIN = 50
+
+class SignalGenerator:
+    """Generate realistic controller frames for all channels.
+
+    Each channel is a constant open-pore baseline with Gaussian noise and randomly
+    injected translocation events, which pull the signal down for an exponentially
+    distributed dwell time. The time field is a microsecond counter that wraps like
+    the controller's. Frames are laid out as described by `schema`. Every set control bit raises the baseline of all
+    channels by `control_gain`, so control-bit changes are visible in the data.
+
+    params:
+        sample_rate (int): Samples per second per channel.
+        baseline (int): Open-pore signal level.
+        noise (float): Standard deviation of the noise.
+        event_rate (float): Mean events per second per channel.
+        event_depth (int): Signal drop during an event.
+        event_dwell (float): Mean event duration in seconds.
+        control_gain (int): Baseline shift per set control bit.
+        seed (int | None): Random seed.
+        schema (FrameSchema): Layout of the generated frames.
+    """
+    def __init__(self, sample_rate: int = DEFAULT_SAMPLE_RATE, baseline: int = DEFAULT_BASELINE, noise: float = DEFAULT_NOISE,
+                 event_rate: float = DEFAULT_EVENT_RATE, event_depth: int = DEFAULT_EVENT_DEPTH, event_dwell: float = DEFAULT_EVENT_DWELL,
+                 control_gain: int = DEFAULT_CONTROL_GAIN, seed: int | None = None, schema: FrameSchema = DEFAULT_SCHEMA) -> None:
+        if sample_rate <= 0:
+            raise ValueError("Sample rate must be positive.")
+        self.sample_rate = sample_rate
+        self.baseline = baseline
+        self.noise = noise
+        self.event_rate = event_rate
+        self.event_depth = event_depth
+        self.event_dwell = event_dwell
+        self.control_gain = control_gain
+        self.control_bits = 0
+        self.events_injected = 0
+        self.schema = schema
+
+        self._rng = np.random.default_rng(seed)
+        self._sample_index = 0
+        self._event_remaining = np.zeros(len(schema.channels), dtype=np.int64)
+
+    @property
+    def frame_rate(self) -> float:
+        """Frames per second at the configured sample rate."""
+        return self.sample_rate / self.schema.samples
+
+    def set_control_bits(self, bits: int) -> None:
+        """Apply new control bits to the generated signal.
+
+        params:
+            bits (int): Control bits as an 8-bit integer.
+        """
+        self.control_bits = bits & 0xFF
+
+    def frames(self, n_frames: int) -> np.ndarray:
+        """Generate the next frames.
+
+        params:
+            n_frames (int): Number of frames.
+
+        returns:
+            np.ndarray: Native-endian frames with shape (n_frames,) in the schema's dtype.
+        """
+        schema = self.schema
+        n_samples = n_frames * schema.samples
+        level = self.baseline + self.control_gain * self.control_bits.bit_count()
+        values = self._rng.normal(level, self.noise, (len(schema.channels), n_samples))
+        self._inject_events(values)
+
+        sample_index = self._sample_index + np.arange(n_samples, dtype=np.int64)
+        time = sample_index * 1_000_000 // self.sample_rate % schema.time_period
+        self._sample_index += n_samples
+
+        limits = np.iinfo(schema.sample_dtype)
+        values = np.clip(values, limits.min, limits.max).astype(schema.sample_dtype)
+        frames = np.empty(n_frames, dtype=schema.dtype)
+        for channel, name in enumerate(schema.channels):
+            frames[name] = values[channel].reshape(n_frames, schema.samples)
+        frames[schema.time_field] = time.reshape(n_frames, schema.samples)
+        return frames
+
+    def _inject_events(self, values: np.ndarray) -> None:
+        """Pull the signal down during events, continuing events from the previous block."""
+        n_samples = values.shape[1]
+        expected = self.event_rate * n_samples / self.sample_rate
+        for channel in range(len(self.schema.channels)):
+            remaining = int(self._event_remaining[channel])
+            if remaining:
+                values[channel, :remaining] -= self.event_depth
+
+            starts = np.sort(self._rng.integers(0, n_samples, self._rng.poisson(expected)))
+            dwells = np.maximum(self._rng.exponential(self.event_dwell * self.sample_rate, len(starts)).astype(np.int64), 1)
+            end = remaining
+            for start, dwell in zip(starts, dwells):
+                if start < end:
+                    continue
+                values[channel, start:start + dwell] -= self.event_depth
+                end = start + dwell
+                self.events_injected += 1
+
+            self._event_remaining[channel] = max(end - n_samples, 0)
@@ -0,0 +1,218 @@
+import collections
+import threading
+import numpy as np
+from nanogui.metrics import get_metrics
+from nanogui.schema import DEFAULT_SCHEMA, FrameSchema
+from nanogui.sinks import DataSink
+from nanogui.timeline import TimeUnwrapper
+
+DEFAULT_BASELINE_WINDOW = 8192
+DEFAULT_START_SIGMA = 5.0
+DEFAULT_END_SIGMA = 1.0
+DEFAULT_MIN_THRESHOLD = 1.0
+DEFAULT_MIN_BATCH = 8192
+MIN_HISTORY = 16
+NOISE_STRIDE = 8
+
+EVENT_DTYPE = np.dtype([
+    ("channel", np.int8),
+    ("start", np.int64),
+    ("end", np.int64),
+    ("dwell", np.int64),
+    ("amplitude", np.float64),
+    ("peak", np.float64),
+    ("baseline", np.float64),
+])
+
+class EventDetector:
+    """Online translocation event detector working block by block.
+
+    The baseline of each channel is the mean of the `baseline_window` samples
+    before each sample, computed with cumulative sums over the carried history and
+    the new block. The noise is estimated once per block from the median absolute
+    deviation of the history, so events do not inflate it. An event starts when the
+    signal drops more than `start_sigma` noise deviations below the baseline and
+    ends when it comes back within `end_sigma` deviations. Events spanning block
+    boundaries are carried over.
+
+    params:
+        channels (int): Number of analog channels.
+        baseline_window (int): Number of samples in the running baseline.
+        start_sigma (float): Drop in noise deviations that starts an event.
+        end_sigma (float): Drop in noise deviations below which an event ends.
+        min_threshold (float): Minimum start threshold in signal units, for noiseless signals.
+    """
+    def __init__(self, channels: int = len(DEFAULT_SCHEMA.channels), baseline_window: int = DEFAULT_BASELINE_WINDOW, start_sigma: float = DEFAULT_START_SIGMA,
+                 end_sigma: float = DEFAULT_END_SIGMA, min_threshold: float = DEFAULT_MIN_THRESHOLD) -> None:
+        if end_sigma >= start_sigma:
+            raise ValueError("End threshold must be below the start threshold.")
+        self._channels = channels
+        self._window = baseline_window
+        self._start_sigma = start_sigma
+        self._end_sigma = end_sigma
+        self._min_threshold = min_threshold
+
+        self._history = np.empty((channels, 0), dtype=np.float64)
+        # state of events still open at the end of the previous block
+        self._open = np.zeros(channels, dtype=bool)
+        self._open_start = np.zeros(channels, dtype=np.int64)
+        self._open_baseline = np.zeros(channels, dtype=np.float64)
+        self._open_sum = np.zeros(channels, dtype=np.float64)
+        self._open_count = np.zeros(channels, dtype=np.int64)
+        self._open_peak = np.zeros(channels, dtype=np.float64)
+
+    @property
+    def open_starts(self) -> np.ndarray:
+        """Start times of the events still open on each channel, -1 on channels without one."""
+        return np.where(self._open, self._open_start, -1)
+
+    def process(self, values: np.ndarray, time: np.ndarray) -> np.ndarray:
+        """Detect events in a block of samples.
+
+        params:
+            values (np.ndarray): Samples with shape (channels, n).
+            time (np.ndarray): Monotonic timestamps with shape (n,).
+
+        returns:
+            np.ndarray: Events completed in this block, as an EVENT_DTYPE array.
+        """
+        n = len(time)
+        if n == 0:
+            return np.empty(0, dtype=EVENT_DTYPE)
+
+        signal = np.concatenate((self._history, values.astype(np.float64)), axis=1)
+        carried = self._history.shape[1]
+        baseline = self._running_mean(signal, carried)
+        noise = self._noise(signal[:, :carried] if carried >= MIN_HISTORY else signal)
+        self._history = signal[:, -self._window:].copy()
+
+        drop = baseline - signal[:, carried:]
+        starts = drop > np.maximum(self._start_sigma * noise, self._min_threshold)
+        ends = drop < self._end_sigma * noise
+        if carried < MIN_HISTORY:
+            starts[:, :MIN_HISTORY - carried] = False
+
+        events = []
+        for channel in range(self._channels):
+            self._scan_channel(channel, starts[channel], ends[channel], drop[channel], baseline[channel], time, events)
+        return np.array(events, dtype=EVENT_DTYPE)
+
+    def _running_mean(self, signal: np.ndarray, carried: int) -> np.ndarray:
+        """Get the mean of the window before each new sample."""
+        width = signal.shape[1]
+        cumulative = np.empty((signal.shape[0], width + 1))
+        cumulative[:, 0] = 0.0
+        np.cumsum(signal, axis=1, out=cumulative[:, 1:])
+
+        if carried >= self._window:
+            begin = slice(carried - self._window, width - self._window)
+            count = self._window
+        else:
+            end = np.arange(carried, width)
+            begin = np.maximum(end - self._window, 0)
+            count = np.maximum(end - begin, 1)
+
+        mean = (cumulative[:, carried:width] - cumulative[:, begin]) / count
+        if carried == 0:
+            # first sample of the stream has no history to compare with
+            mean[:, 0] = signal[:, 0]
+        return mean
+
+    def _noise(self, window: np.ndarray) -> np.ndarray:
+        """Estimate the noise of each channel from the median absolute deviation, ignoring events."""
+        window = window[:, ::NOISE_STRIDE]
+        median = np.median(window, axis=1, keepdims=True)
+        return 1.4826 * np.median(np.abs(window - median), axis=1, keepdims=True)
+
+    def _scan_channel(self, channel: int, starts: np.ndarray, ends: np.ndarray, drop: np.ndarray, baseline: np.ndarray, time: np.ndarray, events: list) -> None:
+        """Walk the threshold crossings of one channel with hysteresis."""
+        start_indices = np.flatnonzero(starts)
+        end_indices = np.flatnonzero(ends)
+        n = len(time)
+        position = 0
+
+        while position < n:
+            if not self._open[channel]:
+                i = np.searchsorted(start_indices, position)
+                if i == len(start_indices):
+                    return
+                position = int(start_indices[i])
+                self._open[channel] = True
+                self._open_start[channel] = time[position]
+                self._open_baseline[channel] = baseline[position]
+                self._open_sum[channel] = 0.0
+                self._open_count[channel] = 0
+                self._open_peak[channel] = 0.0
+
+            i = np.searchsorted(end_indices, position)
+            stop = int(end_indices[i]) if i < len(end_indices) else n
+            if stop > position:
+                segment = drop[position:stop]
+                self._open_sum[channel] += segment.sum()
+                self._open_count[channel] += stop - position
+                self._open_peak[channel] = max(self._open_peak[channel], segment.max())
+            if stop == n:
+                return
+
+            self._open[channel] = False
+            count = max(self._open_count[channel], 1)
+            events.append((
+                channel,
+                self._open_start[channel],
+                time[stop],
+                time[stop] - self._open_start[channel],
+                self._open_sum[channel] / count,
+                self._open_peak[channel],
+                self._open_baseline[channel],
+            ))
+            position = stop + 1
+
+class EventDetectorSink(DataSink):
+    """Run event detection on the receive thread and collect events for the GUI.
+
+    Small blocks are batched until `min_batch` samples are available, so the cost
+    of the baseline window is spread over many samples.
+
+    params:
+        detector (EventDetector | None): Detector to use, defaults to one with default settings for the schema's channels.
+        max_events (int): Maximum number of events kept until taken.
+        min_batch (int): Minimum number of samples per channel passed to the detector at once.
+        schema (FrameSchema): Layout of the received frames.
+    """
+    def __init__(self, detector: EventDetector | None = None, max_events: int = 10000, min_batch: int = DEFAULT_MIN_BATCH, schema: FrameSchema = DEFAULT_SCHEMA) -> None:
+        self._schema = schema
+        self._detector = detector or EventDetector(len(schema.channels))
+        self._unwrapper = TimeUnwrapper(schema.time_period)
+        self._min_batch = min_batch
+        self._pending = []
+        self._pending_samples = 0
+        self._events = collections.deque(maxlen=max_events)
+        self._lock = threading.Lock()
+        self._detected = get_metrics().counter("events_detected")
+
+    def write(self, frames: np.ndarray, controller_id: int = 0) -> None:
+        self._pending.append(frames)
+        self._pending_samples += len(frames) * self._schema.samples
+        if self._pending_samples < self._min_batch:
+            return
+
+        frames = self._pending[0] if len(self._pending) == 1 else np.concatenate(self._pending)
+        self._pending = []
+        self._pending_samples = 0
+        values, counter = self._schema.split(frames)
+        events = self._detector.process(values, self._unwrapper.unwrap(counter))
+        if len(events):
+            self._detected.inc(len(events))
+            with self._lock:
+                self._events.extend(events)
+
+    def take_events(self) -> np.ndarray:
+        """Take the events detected since the last call.
+
+        returns:
+            np.ndarray: Events as an EVENT_DTYPE array.
+        """
+        with self._lock:
+            events = list(self._events)
+            self._events.clear()
+        return np.array(events, dtype=EVENT_DTYPE)
@@ -0,0 +1,163 @@
+import struct
+import numpy as np
+from nanogui.metrics import get_metrics
+from nanogui.schema import DEFAULT_SCHEMA, FrameSchema
+
+# v2 message header: magic, version, channel count, samples per channel, sequence number
+V2_MAGIC = b"NEP2"
+V2_VERSION = 2
+V2_HEADER = struct.Struct(">4sBBHI")
+SEQUENCE_MODULO = 1 << 32
+MAX_MESSAGE_SAMPLES = 0xFFFF
+
+class FrameDecoder:
+    """Reassemble controller frames from a TCP byte stream.
+
+    Bytes are received straight into a preallocated buffer. The protocol is
+    detected from the start of the stream:
+
+    - v1: bare frames laid out as described by the frame schema. Every complete
+      frame in the buffer is decoded at once.
+    - v2: the stream starts with `V2_MAGIC`. Each message is a `V2_HEADER` followed
+      by `samples // schema.samples` frames in the v1 layout. Skipped sequence
+      numbers are counted as sequence gaps, and a header that does not parse is
+      counted as a decode error and skipped up to the next magic.
+
+    The bytes of a trailing partial frame or message are carried over to the front
+    of the buffer for the next read, and the buffer grows if a v2 message does not
+    fit in it.
+
+    params:
+        schema (FrameSchema): Layout of one frame.
+        capacity (int): Number of frames the receive buffer initially holds.
+    """
+    def __init__(self, schema: FrameSchema = DEFAULT_SCHEMA, capacity: int = 256) -> None:
+        if capacity < 2:
+            raise ValueError("Decoder capacity must be at least 2 frames.")
+        self._schema = schema
+        self._buffer = bytearray(capacity * schema.frame_size)
+        self._view = memoryview(self._buffer)
+        self._pending = 0
+        self._carry_from = 0
+        self._required = 0
+        self._protocol = None
+        self._next_sequence = None
+
+        metrics = get_metrics()
+        self._sequence_gaps = metrics.counter("sequence_gaps")
+        self._decode_errors = metrics.counter("decode_errors")
+        self._messages = metrics.counter("messages_received")
+
+    @property
+    def protocol(self) -> int | None:
+        """Protocol version of the stream, or None until enough bytes were received to tell."""
+        return self._protocol
+
+    def get_buffer(self) -> memoryview:
+        """Get the writable region of the receive buffer.
+
+        returns:
+            memoryview: Free space after any carried-over partial frame or message.
+        """
+        if self._required > len(self._buffer):
+            # grow into a new buffer, the exported memoryview prevents resizing in place
+            buffer = bytearray(self._required)
+            buffer[:self._pending] = self._buffer[self._carry_from:self._carry_from + self._pending]
+            self._buffer = buffer
+            self._view = memoryview(buffer)
+            self._carry_from = 0
+        elif self._carry_from:
+            self._buffer[:self._pending] = self._buffer[self._carry_from:self._carry_from + self._pending]
+            self._carry_from = 0
+        return self._view[self._pending:]
+
+    def commit(self, nbytes: int) -> np.ndarray:
+        """Decode the frames completed by `nbytes` newly received bytes.
+
+        params:
+            nbytes (int): Number of bytes written into the buffer.
+
+        returns:
+            np.ndarray: Native-endian frames with shape (n,) in the schema's dtype.
+        """
+        total = self._pending + nbytes
+        if self._protocol is None:
+            if total < len(V2_MAGIC):
+                self._pending = total
+                return np.empty(0, dtype=self._schema.dtype)
+            self._protocol = 2 if self._buffer[:len(V2_MAGIC)] == V2_MAGIC else 1
+
+        if self._protocol == 2:
+            frames, used = self._decode_messages(total)
+        else:
+            n_frames = total // self._schema.frame_size
+            used = n_frames * self._schema.frame_size
+            frames = self._schema.decode(self._buffer, n_frames)
+
+        self._pending = total - used
+        self._carry_from = used
+        return frames
+
+    def _decode_messages(self, total: int) -> tuple[np.ndarray, int]:
+        """Decode every complete v2 message in the first `total` bytes of the buffer."""
+        schema = self._schema
+        payloads = []
+        position = 0
+        while total - position >= V2_HEADER.size:
+            magic, version, channels, samples, sequence = V2_HEADER.unpack_from(self._buffer, position)
+            if magic != V2_MAGIC or version != V2_VERSION or channels != len(schema.channels) or samples == 0 or samples % schema.samples:
+                # lost alignment, skip to the next magic but keep a possible partial one
+                self._decode_errors.inc()
+                position = self._buffer.find(V2_MAGIC, position + 1, total)
+                if position < 0:
+                    position = max(total - len(V2_MAGIC) + 1, 0)
+                    break
+                continue
+
+            n_frames = samples // schema.samples
+            size = V2_HEADER.size + n_frames * schema.frame_size
+            if total - position < size:
+                self._required = size
+                break
+
+            if self._next_sequence is not None and sequence != self._next_sequence:
+                self._sequence_gaps.inc((sequence - self._next_sequence) % SEQUENCE_MODULO)
+            self._next_sequence = (sequence + 1) % SEQUENCE_MODULO
+            self._messages.inc()
+
+            payloads.append(schema.decode(self._buffer, n_frames, position + V2_HEADER.size))
+            position += size
+
+        if not payloads:
+            return np.empty(0, dtype=schema.dtype), position
+        return (payloads[0] if len(payloads) == 1 else np.concatenate(payloads)), position
+
+    @property
+    def pending(self) -> int:
+        """Number of bytes of an incomplete frame or message carried over to the next read."""
+        return self._pending
+
+    def reset(self) -> None:
+        """Discard any carried-over partial frame and detect the protocol again."""
+        self._pending = 0
+        self._carry_from = 0
+        self._required = 0
+        self._protocol = None
+        self._next_sequence = None
+
+def encode_message(frames: np.ndarray, sequence: int, schema: FrameSchema = DEFAULT_SCHEMA) -> bytes:
+    """Encode frames as one v2 message.
+
+    params:
+        frames (np.ndarray): Frames with shape (n,) in the schema's dtype.
+        sequence (int): Message sequence number, wrapping at 2**32.
+        schema (FrameSchema): Layout of one frame.
+
+    returns:
+        bytes: Header and wire-format payload.
+    """
+    samples = len(frames) * schema.samples
+    if samples > MAX_MESSAGE_SAMPLES:
+        raise ValueError(f"A message holds at most {MAX_MESSAGE_SAMPLES // schema.samples} frames.")
+    header = V2_HEADER.pack(V2_MAGIC, V2_VERSION, len(schema.channels), samples, sequence % SEQUENCE_MODULO)
+    return header + schema.encode(frames)
@@ -1,14 +1,46 @@
+import logging
+import math
+import os
 import sys
-from PySide6.QtWidgets import QApplication, QMainWindow, QGridLayout, QWidget, QHBoxLayout, QVBoxLayout, QLabel, QPushButton, QLineEdit, QComboBox
+import threading
+import time
+from PySide6.QtWidgets import QApplication, QMainWindow, QGridLayout, QWidget, QHBoxLayout, QVBoxLayout, QLabel, QPushButton, QLineEdit, QComboBox, QFileDialog, QTableWidget, QTableWidgetItem, QHeaderView, QTabWidget, QSpinBox
 from PySide6.QtGui import QAction
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QObject, QTimer, Signal
 import pyqtgraph as pg
 import numpy as np
+from nanogui import profiling
+from nanogui.acquisition import AcquisitionServer
+from nanogui.blockqueue import DEFAULT_QUEUE_CAPACITY, BlockQueue
+from nanogui.buffer import DEFAULT_CAPACITY, RingBuffer
 from nanogui.context import ApplicationContext, get_app_context
+from nanogui.decimation import MinMaxPyramid
+from nanogui.events import EventDetectorSink
+from nanogui.metrics import JsonLinesExporter, RateTracker, get_metrics
+from nanogui.recorder import CaptureRecorder
+from nanogui.schema import FrameSchema
+from nanogui.sequencer import ControlSequencer, SequenceProgram
 from nanogui.server import TCPServer
+from nanogui.spectrum import WelchAccumulator
+from nanogui.timeline import TimeUnwrapper
+from nanogui.trigger import DEFAULT_POST_SAMPLES, DEFAULT_PRE_SAMPLES, DEFAULT_SWEEPS, TRIGGER_MODES, TriggerEngine, TriggerSink
+
+DEFAULT_RENDER_FPS = 30
+MESSAGE_POLL_INTERVAL_MS = 100
+
+logger = logging.getLogger(__name__)
+
+class SequencerSignals(QObject):
+    """Qt signals carrying sequence loading and playback results to the GUI thread."""
+    sequence_loaded = Signal(object, object)
+    sequence_finished = Signal(object)
 
 class GraphWidget(QWidget):
-    """Graph widget with label."""
+    """Graph widget with label.
+
+    The plot follows the newest data until the user pans or zooms, and resumes
+    following when the auto-range button is clicked.
+    """
     def __init__(self, label: str) -> None:
         super().__init__()
         layout = QVBoxLayout()
@@ -24,13 +56,240 @@ class GraphWidget(QWidget):
         layout.addWidget(self.plot_widget)
 
         self.curve = self.plot_widget.plot(pen=pg.mkPen(color=(255, 0, 0), width=2))
+        self._render_time = get_metrics().histogram(f"render_seconds.{label}")
+
+        self._pyramid = None
+        self._channel_index = 0
+        self._follow = True
+        self.plot_widget.getViewBox().sigRangeChangedManually.connect(self._on_range_changed_manually)
+        self.plot_widget.getPlotItem().autoBtn.clicked.connect(self._on_follow_clicked)
+
+    def set_source(self, pyramid: MinMaxPyramid, channel_index: int) -> None:
+        """Set the data source of the plot.
+
+        params:
+            pyramid (MinMaxPyramid): Decimation pyramid holding the channel history.
+            channel_index (int): Index of the channel in the pyramid.
+        """
+        self._pyramid = pyramid
+        self._channel_index = channel_index
+
+    def update_plot(self) -> None:
+        """Update the plot from the data source at the resolution of the viewport."""
+        if self._pyramid is None:
+            return
 
-    def update_plot(self, x_data: list[int], y_data: list[int]) -> None:
-        """Update the plot with new data."""
-        if len(x_data) > 0:
-            self.plot_widget.setXRange(min(x_data), max(x_data), padding=0.1)
+        start = time.perf_counter()
+        view_box = self.plot_widget.getViewBox()
+        max_bins = int(view_box.width()) or 1
+        x_range = None if self._follow else tuple(view_box.viewRange()[0])
+        x_data, y_data = self._pyramid.view(self._channel_index, max_bins, x_range)
+
+        if self._follow and len(x_data) > 0:
+            self.plot_widget.setXRange(x_data[0], x_data[-1], padding=0.1)
 
         self.curve.setData(x=x_data, y=y_data)
+        self._render_time.observe(time.perf_counter() - start)
+
+    def _on_range_changed_manually(self, *_) -> None:
+        """Stop following new data and redraw at the new zoom level."""
+        self._follow = False
+        self.update_plot()
+
+    def _on_follow_clicked(self) -> None:
+        """Resume following new data."""
+        self._follow = True
+        self.update_plot()
+
+class SpectrumWidget(QWidget):
+    """Log-log plot of the power spectral density of every channel."""
+    COLORS = ((255, 0, 0), (0, 200, 0), (60, 140, 255), (255, 200, 0))
+
+    def __init__(self, channel_names: tuple[str, ...]) -> None:
+        super().__init__()
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+
+        self.plot_widget = pg.PlotWidget()
+        self.plot_widget.setLogMode(x=True, y=True)
+        self.plot_widget.setLabel("left", "PSD (units^2/Hz)")
+        self.plot_widget.setLabel("bottom", "Frequency (Hz)")
+        self.plot_widget.showGrid(x=True, y=True, alpha=0.3)
+        self.plot_widget.addLegend()
+        layout.addWidget(self.plot_widget)
+
+        self.curves = [
+            self.plot_widget.plot(pen=pg.mkPen(color=self.COLORS[i % len(self.COLORS)], width=1), name=f"Channel {name}")
+            for i, name in enumerate(channel_names)
+        ]
+
+        self.reset_button = QPushButton("Reset Average")
+        self.reset_button.clicked.connect(self._on_reset_clicked)
+        layout.addWidget(self.reset_button)
+
+        self._spectrum = None
+        self._drawn_segments = 0
+
+    def set_source(self, spectrum: WelchAccumulator) -> None:
+        """Set the data source of the plot.
+
+        params:
+            spectrum (WelchAccumulator): Running spectrum of every channel.
+        """
+        self._spectrum = spectrum
+        self._drawn_segments = 0
+
+    def update_plot(self) -> None:
+        """Redraw the spectrum if segments were added since the last redraw."""
+        if self._spectrum is None or self._spectrum.segments == self._drawn_segments:
+            return
+        frequencies = self._spectrum.frequencies
+        # the DC bin cannot be shown on a log axis
+        for curve, psd in zip(self.curves, self._spectrum.psd):
+            curve.setData(x=frequencies[1:], y=psd[1:])
+        self._drawn_segments = self._spectrum.segments
+
+    def _on_reset_clicked(self) -> None:
+        """Restart the running average."""
+        if self._spectrum is None:
+            return
+        self._spectrum.reset()
+        self._drawn_segments = 0
+        for curve in self.curves:
+            curve.setData([], [])
+
+class TriggerWidget(QWidget):
+    """Oscilloscope-style display of the sweeps captured around triggers.
+
+    Only the kept sweeps are drawn, overlaid or averaged, so the cost of a redraw
+    depends on the sweep length and count, not on the acquisition rate. Each
+    channel is drawn as a single curve with breaks between sweeps.
+    """
+    COLORS = SpectrumWidget.COLORS
+    CONTROL_SOURCE = "Control bits"
+
+    def __init__(self, channel_names: tuple[str, ...]) -> None:
+        super().__init__()
+        self._channel_names = channel_names
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+
+        ### Trigger Settings ###
+        source_layout = QHBoxLayout()
+        source_layout.addWidget(QLabel("Source:"))
+        self.source_input = QComboBox()
+        self.source_input.addItems([f"Channel {name}" for name in channel_names] + [self.CONTROL_SOURCE])
+        source_layout.addWidget(self.source_input)
+        source_layout.addWidget(QLabel("Mode:"))
+        self.mode_input = QComboBox()
+        self.mode_input.addItems([mode.capitalize() for mode in TRIGGER_MODES])
+        self.mode_input.setCurrentIndex(TRIGGER_MODES.index("falling"))
+        source_layout.addWidget(self.mode_input)
+        source_layout.addWidget(QLabel("Level:"))
+        self.level_input = QLineEdit("0")
+        source_layout.addWidget(self.level_input)
+        layout.addLayout(source_layout)
+
+        window_layout = QHBoxLayout()
+        self.pre_input = self._add_spin_box(window_layout, "Pre:", 0, 1 << 20, DEFAULT_PRE_SAMPLES)
+        self.post_input = self._add_spin_box(window_layout, "Post:", 1, 1 << 20, DEFAULT_POST_SAMPLES)
+        self.sweeps_input = self._add_spin_box(window_layout, "Sweeps:", 1, 256, DEFAULT_SWEEPS)
+        self.display_input = QComboBox()
+        self.display_input.addItems(["Overlay", "Average"])
+        self.display_input.currentIndexChanged.connect(self._on_display_changed)
+        window_layout.addWidget(self.display_input)
+        self.apply_button = QPushButton("Apply")
+        window_layout.addWidget(self.apply_button)
+        layout.addLayout(window_layout)
+
+        self.plot_widget = pg.PlotWidget()
+        self.plot_widget.setLabel("left", "Analog Value")
+        self.plot_widget.setLabel("bottom", "Time from trigger (us)")
+        self.plot_widget.showGrid(x=True, y=True, alpha=0.3)
+        self.plot_widget.addLegend()
+        self.plot_widget.addItem(pg.InfiniteLine(0, angle=90, pen=pg.mkPen((150, 150, 150), style=Qt.DashLine)))
+        layout.addWidget(self.plot_widget)
+
+        self.curves = [
+            self.plot_widget.plot(pen=pg.mkPen(color=self.COLORS[i % len(self.COLORS)], width=1), name=f"Channel {name}", connect="finite")
+            for i, name in enumerate(channel_names)
+        ]
+        self.sweep_label = QLabel("Sweeps: 0")
+        layout.addWidget(self.sweep_label)
+
+        self._sink = None
+        self._drawn_count = 0
+        self._render_time = get_metrics().histogram("render_seconds.trigger")
+
+    def _add_spin_box(self, layout: QHBoxLayout, label: str, minimum: int, maximum: int, value: int) -> QSpinBox:
+        """Add a labelled integer input to a row."""
+        layout.addWidget(QLabel(label))
+        spin_box = QSpinBox()
+        spin_box.setRange(minimum, maximum)
+        spin_box.setValue(value)
+        layout.addWidget(spin_box)
+        return spin_box
+
+    def set_source(self, sink: TriggerSink) -> None:
+        """Set the data source of the plot.
+
+        params:
+            sink (TriggerSink): Trigger sink capturing the sweeps.
+        """
+        self._sink = sink
+        self._drawn_count = 0
+
+    def create_engine(self) -> TriggerEngine:
+        """Create a trigger engine from the settings.
+
+        returns:
+            TriggerEngine: The engine.
+        """
+        source = self.source_input.currentIndex()
+        return TriggerEngine(
+            len(self._channel_names),
+            source=None if source == len(self._channel_names) else source,
+            mode=TRIGGER_MODES[self.mode_input.currentIndex()],
+            level=float(self.level_input.text()),
+            pre=self.pre_input.value(),
+            post=self.post_input.value(),
+            sweeps=self.sweeps_input.value(),
+        )
+
+    def update_plot(self) -> None:
+        """Redraw the sweeps if new ones were captured since the last redraw."""
+        if self._sink is None or self._sink.engine.count == self._drawn_count:
+            return
+
+        start = time.perf_counter()
+        count, sweeps, time_axis = self._sink.snapshot()
+        if time_axis is None or len(sweeps) == 0:
+            return
+        if self.display_input.currentText() == "Average":
+            x_data = time_axis
+            y_data = sweeps.mean(axis=0)
+        else:
+            # one curve per channel, sweeps separated by NaN breaks
+            x_data = np.tile(np.append(time_axis, np.nan), len(sweeps))
+            padded = np.concatenate((sweeps, np.full(sweeps.shape[:2] + (1,), np.nan, dtype=sweeps.dtype)), axis=2)
+            y_data = padded.transpose(1, 0, 2).reshape(len(self.curves), -1)
+        for curve, y in zip(self.curves, y_data):
+            curve.setData(x=x_data, y=y)
+        self.sweep_label.setText(f"Sweeps: {count} ({len(sweeps)} shown)")
+        self._drawn_count = count
+        self._render_time.observe(time.perf_counter() - start)
+
+    def clear(self) -> None:
+        """Clear the plot after the trigger settings changed."""
+        self._drawn_count = 0
+        for curve in self.curves:
+            curve.setData([], [])
+        self.sweep_label.setText("Sweeps: 0")
+
+    def _on_display_changed(self) -> None:
+        """Redraw the kept sweeps in the new display mode."""
+        self._drawn_count = -1
+        self.update_plot()
 
 class ConnectionPanelWidget(QWidget):
     """Widget for setting up the connection to the server."""
@@ -120,34 +379,211 @@ class ControlPanelWidget(QWidget):
         if self.update_callback:
             self.update_callback(control_bits)
 
-class DataPanelWidget(QWidget):
-    """Widget for displaying data."""
+class SequencerPanelWidget(QWidget):
+    """Widget for loading and running control-bit sequences."""
     def __init__(self) -> None:
         super().__init__()
+        self.setFixedSize(300, 100)
+
+        main_layout = QVBoxLayout()
+        main_layout.addWidget(QLabel("Sequencer"))
+
+        self.sequence_label = QLabel("No sequence loaded")
+        main_layout.addWidget(self.sequence_label)
+
+        ### Load, Run and Stop Buttons ###
+        button_layout = QHBoxLayout()
+
+        self.load_button = QPushButton("Load...")
+        button_layout.addWidget(self.load_button)
+
+        self.run_button = QPushButton("Run")
+        self.run_button.setEnabled(False)
+        button_layout.addWidget(self.run_button)
+
+        self.stop_button = QPushButton("Stop")
+        self.stop_button.setEnabled(False)
+        button_layout.addWidget(self.stop_button)
+
+        main_layout.addLayout(button_layout)
+        self.setLayout(main_layout)
+
+    def set_running(self, running: bool) -> None:
+        """Enable the buttons matching whether a sequence is running.
+
+        params:
+            running (bool): Whether a sequence is running.
+        """
+        self.load_button.setEnabled(not running)
+        self.run_button.setEnabled(not running)
+        self.stop_button.setEnabled(running)
+
+class StatsPanelWidget(QWidget):
+    """Widget for displaying live pipeline metrics."""
+    def __init__(self) -> None:
+        super().__init__()
+        self.setFixedSize(300, 210)
+
+        main_layout = QVBoxLayout()
+        main_layout.addWidget(QLabel("Statistics"))
+
+        self._grid = QGridLayout()
+        main_layout.addLayout(self._grid)
+        main_layout.addStretch()
+        self.setLayout(main_layout)
+        self._values = {}
+
+    def _set_row(self, name: str, value: str) -> None:
+        """Set the value of a row, adding the row if needed."""
+        label = self._values.get(name)
+        if label is None:
+            row = len(self._values)
+            self._grid.addWidget(QLabel(f"{name}:"), row, 0)
+            label = self._values[name] = QLabel()
+            label.setAlignment(Qt.AlignRight)
+            self._grid.addWidget(label, row, 1)
+        label.setText(value)
+
+    def update_stats(self, snapshot: dict) -> None:
+        """Show a metrics snapshot.
+
+        params:
+            snapshot (dict): Snapshot with rates from RateTracker.sample.
+        """
+        rates = snapshot["rates"]
+        counters = snapshot["counters"]
+        self._set_row("Receive", f"{rates.get('bytes_received', 0) / 1e6:.2f} MB/s")
+        self._set_row("Frames", f"{rates.get('frames_received', 0):.0f} /s")
+        self._set_row("Partial frames", f"{rates.get('partial_frames', 0):.0f} /s")
+        self._set_row("Decode errors", f"{counters.get('decode_errors', 0)}")
+        self._set_row("Sequence gaps", f"{counters.get('sequence_gaps', 0)}")
+        self._set_row("Dropped frames", f"{counters.get('frames_dropped', 0)}")
+        self._set_row("Events", f"{rates.get('events_detected', 0):.1f} /s")
+        self._set_row("Queue depth", f"{snapshot['gauges'].get('queue_depth', 0):.0f} frames")
+        # slowest graph, so the panel does not grow with the number of channels
+        renders = [summary for name, summary in snapshot["histograms"].items() if name.startswith("render_seconds.")]
+        if renders:
+            p50 = max(summary["p50"] for summary in renders)
+            slowest = max(summary["max"] for summary in renders)
+            self._set_row("Render", f"{p50 * 1e3:.1f} / {slowest * 1e3:.1f} ms")
+
+class EventPanelWidget(QWidget):
+    """Widget listing detected translocation events.
+
+    params:
+        channel_names (tuple[str, ...]): Name of each channel index.
+        max_rows (int): Maximum number of events shown.
+        rate_window (float): Seconds over which the event rate is averaged.
+    """
+    def __init__(self, channel_names: tuple[str, ...], max_rows: int = 500, rate_window: float = 10.0) -> None:
+        super().__init__()
+        self.setFixedWidth(300)
+        self._channel_names = channel_names
+        self._max_rows = max_rows
+        self._rate_window = rate_window
+        self._arrivals = []
+        self._total = 0
+        self._started = time.monotonic()
+
+        main_layout = QVBoxLayout()
+        self.summary_label = QLabel()
+        main_layout.addWidget(self.summary_label)
+
+        self.table = QTableWidget(0, 4)
+        self.table.setHorizontalHeaderLabels(["Ch", "Start (us)", "Dwell (us)", "Amplitude"])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        main_layout.addWidget(self.table)
+        self.setLayout(main_layout)
+        self._update_summary()
+
+    def add_events(self, events: np.ndarray) -> None:
+        """Add detected events to the top of the table.
+
+        params:
+            events (np.ndarray): Events as an EVENT_DTYPE array.
+        """
+        now = time.monotonic()
+        if len(events):
+            self._total += len(events)
+            self._arrivals.append((now, len(events)))
+
+            events = events[-self._max_rows:]
+            self.table.setUpdatesEnabled(False)
+            for event in events:
+                self.table.insertRow(0)
+                self.table.setItem(0, 0, QTableWidgetItem(self._channel_names[event["channel"]]))
+                self.table.setItem(0, 1, QTableWidgetItem(str(event["start"])))
+                self.table.setItem(0, 2, QTableWidgetItem(str(event["dwell"])))
+                self.table.setItem(0, 3, QTableWidgetItem(f"{event['amplitude']:.1f}"))
+            self.table.setRowCount(min(self.table.rowCount(), self._max_rows))
+            self.table.setUpdatesEnabled(True)
+
+        self._arrivals = [(arrival, n) for arrival, n in self._arrivals if now - arrival <= self._rate_window]
+        self._update_summary()
+
+    def _update_summary(self) -> None:
+        """Show the total event count and recent event rate."""
+        elapsed = min(time.monotonic() - self._started, self._rate_window)
+        rate = sum(n for _, n in self._arrivals) / elapsed if elapsed > 0 else 0.0
+        self.summary_label.setText(f"Events: {self._total} ({rate:.1f} /s)")
+
+class DataPanelWidget(QTabWidget):
+    """Widget for displaying data, with the channel graphs, the spectrum and the trigger sweeps in separate tabs.
+
+    params:
+        channel_names (tuple[str, ...]): Name of each channel, one graph is created per channel.
+    """
+    def __init__(self, channel_names: tuple[str, ...]) -> None:
+        super().__init__()
+        self.signal_tab = QWidget()
         layout = QGridLayout()
-        self.setLayout(layout)
+        self.signal_tab.setLayout(layout)
+        self.addTab(self.signal_tab, "Signals")
+
+        self.spectrum = SpectrumWidget(channel_names)
+        self.addTab(self.spectrum, "Spectrum")
+
+        self.trigger = TriggerWidget(channel_names)
+        self.addTab(self.trigger, "Trigger")
 
-        self.channel_a = GraphWidget("Channel A")
-        self.channel_b = GraphWidget("Channel B")
-        self.channel_c = GraphWidget("Channel C")
-        self.channel_d = GraphWidget("Channel D")
+        self.graphs = {name: GraphWidget(f"Channel {name}") for name in channel_names}
+        columns = math.ceil(math.sqrt(len(channel_names)))
+        for i, graph in enumerate(self.graphs.values()):
+            layout.addWidget(graph, i // columns, i % columns)
+
+    def set_source(self, pyramid: MinMaxPyramid, spectrum: WelchAccumulator, trigger: TriggerSink) -> None:
+        """Set the data source of every channel graph, the spectrum and the trigger sweeps.
+
+        params:
+            pyramid (MinMaxPyramid): Decimation pyramid holding the channel history.
+            spectrum (WelchAccumulator): Running spectrum of every channel.
+            trigger (TriggerSink): Trigger sink capturing the sweeps.
+        """
+        self.spectrum.set_source(spectrum)
+        self.trigger.set_source(trigger)
+        for index, graph in enumerate(self.graphs.values()):
+            graph.set_source(pyramid, index)
 
-        layout.addWidget(self.channel_a, 0, 0)
-        layout.addWidget(self.channel_b, 0, 1)
-        layout.addWidget(self.channel_c, 1, 0)
-        layout.addWidget(self.channel_d, 1, 1)
+    @property
+    def signals_shown(self) -> bool:
+        """Whether the channel graphs tab is shown."""
+        return self.currentWidget() is self.signal_tab
 
-    def update_channel(self, channel: str, x_data: list[int], y_data: list[int]) -> None:
+    def update_channel(self, channel: str) -> None:
         """Update a specific channel graph."""
-        if channel == "A":
-            self.channel_a.update_plot(x_data, y_data)
-        elif channel == "B":
-            self.channel_b.update_plot(x_data, y_data)
-        elif channel == "C":
-            self.channel_c.update_plot(x_data, y_data)
-        elif channel == "D":
-            self.channel_d.update_plot(x_data, y_data)
+        self.graphs[channel].update_plot()
 
+    def update_spectrum(self) -> None:
+        """Update the spectrum if its tab is shown."""
+        if self.currentWidget() is self.spectrum:
+            self.spectrum.update_plot()
+
+    def update_trigger(self) -> None:
+        """Update the trigger sweeps if their tab is shown."""
+        if self.currentWidget() is self.trigger:
+            self.trigger.update_plot()
 
 class MainWindow(QMainWindow):
     """Main application window.
@@ -155,18 +591,33 @@ class MainWindow(QMainWindow):
     params:
         context (ApplicationContext): Application context.
         server (TCPServer): TCPServer instance.
+        buffer_capacity (int): Number of samples of history kept per channel.
+        render_fps (float): Maximum number of graph redraws per second.
+        metrics_file (str | None): JSON lines file to export metrics to, or None to not export.
+        queue_policy (str): Overflow policy of the queue between the receive thread and the GUI.
+        record_codec (str | None): Compressor of recorded chunks, "zlib" or "lzma", or None to record raw frames.
     """
-    def __init__(self, context: ApplicationContext, server: TCPServer) -> None:
+    def __init__(self, context: ApplicationContext, server: TCPServer, buffer_capacity: int = DEFAULT_CAPACITY, render_fps: float = DEFAULT_RENDER_FPS, metrics_file: str | None = None, queue_policy: str = "drop_oldest", record_codec: str | None = None) -> None:
         super().__init__()
         self._context = context
         self._server = server
-
-        self.channel_data = {
-            "A": {"time": [], "value": []},
-            "B": {"time": [], "value": []},
-            "C": {"time": [], "value": []},
-            "D": {"time": [], "value": []},
-        }
+        self._schema = context.get_schema()
+        self.channels = self._schema.channels
+
+        self.channel_buffer = RingBuffer(buffer_capacity, len(self.channels), self._schema.sample_dtype)
+        self.channel_pyramid = MinMaxPyramid(self.channel_buffer)
+        self.channel_spectrum = WelchAccumulator(len(self.channels))
+        self._time_unwrapper = TimeUnwrapper(self._schema.time_period)
+        self._dirty_channels = set()
+        self._update_stage = profiling.stage("gui.update_graph")
+        self._render_stage = profiling.stage("gui.render")
+        self._recorder = None
+        self._record_codec = record_codec
+        self._block_queue = BlockQueue(DEFAULT_QUEUE_CAPACITY, queue_policy)
+        self._event_sink = EventDetectorSink(schema=self._schema)
+        self._trigger_sink = TriggerSink(schema=self._schema)
+        self._sequencer = ControlSequencer(self._server.write_control_bits, on_send=lambda _: self._trigger_sink.arm())
+        self._sequence = None
         
         self.setFixedSize(1280, 980)
         self.setWindowTitle("Quantum-NanoElectroPore Controller GUI")
@@ -179,6 +630,15 @@ class MainWindow(QMainWindow):
 
         ### File Menu ###
         file_menu = menu_bar.addMenu("File")
+        self._record_action = QAction("Start Recording...", self)
+        self._record_action.triggered.connect(self.start_recording)
+        file_menu.addAction(self._record_action)
+        self._stop_record_action = QAction("Stop Recording", self)
+        self._stop_record_action.setEnabled(False)
+        self._stop_record_action.triggered.connect(self.stop_recording)
+        file_menu.addAction(self._stop_record_action)
+        file_menu.addSeparator()
+
         exit_action = QAction("Exit", self)
         exit_action.triggered.connect(self.close)
         file_menu.addAction(exit_action)
@@ -193,8 +653,18 @@ class MainWindow(QMainWindow):
         self._control_panel_widget = ControlPanelWidget(self.update_control_bits)
         left_panel.addWidget(self._control_panel_widget)
 
+        self._sequencer_panel_widget = SequencerPanelWidget()
+        left_panel.addWidget(self._sequencer_panel_widget)
+
+        self._stats_panel_widget = StatsPanelWidget()
+        left_panel.addWidget(self._stats_panel_widget)
+
+        self._event_panel_widget = EventPanelWidget(self.channels)
+        left_panel.addWidget(self._event_panel_widget)
+
         right_panel = QVBoxLayout()
-        self._data_panel_widget = DataPanelWidget()
+        self._data_panel_widget = DataPanelWidget(self.channels)
+        self._data_panel_widget.set_source(self.channel_pyramid, self.channel_spectrum, self._trigger_sink)
         right_panel.addWidget(self._data_panel_widget)
 
         central_widget.setLayout(main_layout)
@@ -202,36 +672,97 @@ class MainWindow(QMainWindow):
         main_layout.addLayout(right_panel)
 
         ### Message Handling ###
+        # the status bar polls the context, so a storm of messages from the
+        # receive thread costs at most one repaint per poll
         self.statusBar().showMessage(self._context.get_message())
-        self._context.message_changed.connect(self.statusBar().showMessage)
+        self._message_serial, _ = self._context.poll_message(0)
+        self._message_timer = QTimer(self)
+        self._message_timer.timeout.connect(self.update_message)
+        self._message_timer.start(MESSAGE_POLL_INTERVAL_MS)
+        self._sequencer_signals = SequencerSignals(self)
+        self._sequencer_signals.sequence_loaded.connect(self._on_sequence_loaded)
+        self._sequencer_signals.sequence_finished.connect(self._on_sequence_finished)
 
         ### Connect Buttons ###
         self._connection_panel_widget.start_button.clicked.connect(self.start_server)
         self._connection_panel_widget.stop_button.clicked.connect(self.stop_server)
+        self._sequencer_panel_widget.load_button.clicked.connect(self.load_sequence)
+        self._sequencer_panel_widget.run_button.clicked.connect(self.run_sequence)
+        self._sequencer_panel_widget.stop_button.clicked.connect(self.stop_sequence)
+        self._data_panel_widget.trigger.apply_button.clicked.connect(self.apply_trigger)
+
+        self._server.add_sink(self._block_queue)
+        self._server.add_sink(self._event_sink)
+        self._server.add_sink(self._trigger_sink)
+
+        ### Render Loop ###
+        self._render_timer = QTimer(self)
+        self._render_timer.timeout.connect(self.render)
+        self.set_render_fps(render_fps)
+
+        ### Metrics ###
+        self._rate_tracker = RateTracker(get_metrics())
+        self._stats_timer = QTimer(self)
+        self._stats_timer.timeout.connect(self.update_stats)
+        self._stats_timer.start(1000)
+        self._metrics_exporter = None
+        if metrics_file:
+            self._metrics_exporter = JsonLinesExporter(get_metrics(), metrics_file)
+            self._metrics_exporter.start()
+
+    def update_message(self) -> None:
+        """Show the context message in the status bar if it changed."""
+        self._message_serial, message = self._context.poll_message(self._message_serial)
+        if message is not None:
+            self.statusBar().showMessage(message)
+
+    def update_stats(self) -> None:
+        """Refresh the statistics panel."""
+        self._stats_panel_widget.update_stats(self._rate_tracker.sample())
+
+    def update_graph(self, frames: np.ndarray) -> None:
+        """Buffer a block of received frames for the next render.
+
+        params:
+            frames (np.ndarray): Decoded frames with shape (n,) in the schema's dtype.
+        """
+        if len(frames) == 0:
+            return
+        with self._update_stage:
+            values, counter = self._schema.split(frames)
+            time_values = self._time_unwrapper.unwrap(counter)
+            self.channel_pyramid.append(values, time_values)
+            self.channel_spectrum.append(values, time_values)
+        self._dirty_channels.update(self.channels)
+
+    def render(self) -> None:
+        """Take queued frames and redraw the channels that received data since the last render."""
+        with self._render_stage:
+            frames = self._block_queue.get_all()
+            if frames is not None:
+                self.update_graph(frames)
+            self._event_panel_widget.add_events(self._event_sink.take_events())
+            self._data_panel_widget.update_spectrum()
+            self._data_panel_widget.update_trigger()
+
+            # hidden graphs are redrawn once their tab is shown again
+            if not self._dirty_channels or not self._data_panel_widget.signals_shown:
+                return
+
+            for channel in self.channels:
+                if channel in self._dirty_channels:
+                    self._data_panel_widget.update_channel(channel)
+            self._dirty_channels.clear()
+
+    def set_render_fps(self, fps: float) -> None:
+        """Set the maximum graph redraw rate.
 
-        self._server.signals.data_received.connect(self.update_graph)
-
-    def update_graph(self, data: list[int]) -> None:
-        """Update graphs with received data."""
-        channel_a_data = data[0:16]
-        channel_b_data = data[16:32]
-        channel_c_data = data[32:48]
-        channel_d_data = data[48:64]
-        time_data = data[64:80]
-
-        self.channel_data["A"]["value"].extend(channel_a_data)
-        self.channel_data["B"]["value"].extend(channel_b_data)
-        self.channel_data["C"]["value"].extend(channel_c_data)
-        self.channel_data["D"]["value"].extend(channel_d_data)
-        self.channel_data["A"]["time"].extend(time_data)
-        self.channel_data["B"]["time"].extend(time_data)
-        self.channel_data["C"]["time"].extend(time_data)
-        self.channel_data["D"]["time"].extend(time_data)
-
-        self._data_panel_widget.update_channel("A", self.channel_data["A"]["time"], self.channel_data["A"]["value"])
-        self._data_panel_widget.update_channel("B", self.channel_data["B"]["time"], self.channel_data["B"]["value"])
-        self._data_panel_widget.update_channel("C", self.channel_data["C"]["time"], self.channel_data["C"]["value"])
-        self._data_panel_widget.update_channel("D", self.channel_data["D"]["time"], self.channel_data["D"]["value"])
+        params:
+            fps (float): Redraws per second.
+        """
+        if fps <= 0:
+            raise ValueError("Render rate must be positive.")
+        self._render_timer.start(max(1, round(1000 / fps)))
 
     def start_server(self) -> None:
         """Start the server with the host and port specified in the connection panel."""
@@ -252,7 +783,7 @@ class MainWindow(QMainWindow):
         except ValueError:
             self._context.set_message("Invalid port number.")
         except Exception as e:
-            print(str(e))
+            logger.warning(str(e))
             self._context.set_message(str(e))
 
     def stop_server(self) -> None:
@@ -261,6 +792,121 @@ class MainWindow(QMainWindow):
         self._connection_panel_widget.start_button.setEnabled(True)
         self._connection_panel_widget.stop_button.setEnabled(False)
 
+    def start_recording(self) -> None:
+        """Ask for a capture file and start recording received frames to it."""
+        path, _ = QFileDialog.getSaveFileName(self, "Start Recording", "capture.nep", "Captures (*.nep)")
+        if not path:
+            return
+
+        try:
+            recorder = CaptureRecorder(path, schema=self._schema, codec=self._record_codec)
+            recorder.start()
+        except OSError as e:
+            logger.warning(str(e))
+            self._context.set_message(str(e))
+            return
+
+        self._recorder = recorder
+        self._server.add_sink(recorder)
+        self._record_action.setEnabled(False)
+        self._stop_record_action.setEnabled(True)
+        self._context.set_message(f"Recording to {path}")
+
+    def stop_recording(self) -> None:
+        """Stop recording and finish the capture file."""
+        if not self._recorder:
+            return
+
+        self._server.remove_sink(self._recorder)
+        try:
+            self._recorder.stop()
+        except (OSError, ValueError) as e:
+            self._context.set_message(f"Recording to {self._recorder.path} failed: {e}")
+        else:
+            self._context.set_message(f"Recorded {self._recorder.frames_written} frames to {self._recorder.path}")
+        self._recorder = None
+        self._record_action.setEnabled(True)
+        self._stop_record_action.setEnabled(False)
+
+    def apply_trigger(self) -> None:
+        """Restart triggering with the settings of the trigger tab."""
+        try:
+            engine = self._data_panel_widget.trigger.create_engine()
+        except ValueError as e:
+            self._context.set_message(f"Invalid trigger settings: {e}")
+            return
+        self._trigger_sink.set_engine(engine)
+        self._data_panel_widget.trigger.clear()
+
+    def load_sequence(self) -> None:
+        """Ask for a sequence file and parse it on a worker thread."""
+        path, _ = QFileDialog.getOpenFileName(self, "Load Sequence", "", "Sequences (*.seq *.txt);;All Files (*)")
+        if not path:
+            return
+
+        def load() -> None:
+            try:
+                program = SequenceProgram.load(path)
+            except (OSError, ValueError) as e:
+                self._sequencer_signals.sequence_loaded.emit(path, e)
+                return
+            self._sequencer_signals.sequence_loaded.emit(path, program)
+
+        self._sequencer_panel_widget.load_button.setEnabled(False)
+        self._context.set_message(f"Loading sequence {path}...")
+        threading.Thread(target=load, daemon=True).start()
+
+    def _on_sequence_loaded(self, path: str, result) -> None:
+        """Take a sequence parsed by the loading thread."""
+        self._sequencer_panel_widget.load_button.setEnabled(True)
+        if isinstance(result, Exception):
+            logger.warning(f"Could not load sequence: {result}")
+            self._context.set_message(f"Could not load sequence: {result}")
+            return
+
+        self._sequence = result
+        steps = len(result.steps) * result.repeat
+        self._sequencer_panel_widget.sequence_label.setText(f"{os.path.basename(path)}: {steps} steps, {result.duration:.3f} s")
+        self._sequencer_panel_widget.run_button.setEnabled(True)
+        self._context.set_message(f"Loaded sequence {path}")
+
+    def run_sequence(self) -> None:
+        """Start running the loaded sequence."""
+        if not self._sequence or self._sequencer.running:
+            return
+        self._sequencer.start(self._sequence, self._sequencer_signals.sequence_finished.emit)
+        self._sequencer_panel_widget.set_running(True)
+        self._context.set_message("Running sequence...")
+
+    def stop_sequence(self) -> None:
+        """Stop the running sequence."""
+        self._sequencer.stop()
+
+    def _on_sequence_finished(self, stats: dict) -> None:
+        """Report the timing of a finished sequence."""
+        self._sequencer_panel_widget.set_running(False)
+        if self._sequencer.error:
+            message = f"Sequence stopped after {stats['steps']} steps: {self._sequencer.error}"
+        else:
+            message = (f"Sequence sent {stats['steps']} steps, lateness p50 {stats['p50'] * 1e6:.0f} us, "
+                       f"p99 {stats['p99'] * 1e6:.0f} us, max {stats['max'] * 1e6:.0f} us")
+        logger.info(message)
+        self._context.set_message(message)
+
+    def closeEvent(self, event) -> None:
+        """Stop any running sequence, finish any running recording and stop the server before closing."""
+        self._sequencer.stop()
+        self.stop_recording()
+        if self._connection_panel_widget.stop_button.isEnabled():
+            self.stop_server()
+        self._server.remove_sink(self._block_queue)
+        self._server.remove_sink(self._event_sink)
+        self._server.remove_sink(self._trigger_sink)
+        self._block_queue.close()
+        if self._metrics_exporter:
+            self._metrics_exporter.stop()
+        super().closeEvent(event)
+
     def update_control_bits(self, control_bits: list[int]):
         """Update the control bits in context and send to client.
         
@@ -270,15 +916,28 @@ class MainWindow(QMainWindow):
         try:
             self._context.set_control_bits(control_bits)
             self._server.send_control_bits()
+            self._trigger_sink.arm()
         except Exception as e:
-            print(str(e))
+            logger.warning(str(e))
             self._context.set_message(str(e))
 
-def run() -> None:
-    """Run the application."""
+def run(metrics_file: str | None = None, queue_policy: str = "drop_oldest", acquisition_process: bool = False, schema: FrameSchema | None = None, compress: str | None = None, buffer_capacity: int = DEFAULT_CAPACITY, render_fps: float = DEFAULT_RENDER_FPS) -> None:
+    """Run the application.
+
+    params:
+        metrics_file (str | None): JSON lines file to export metrics to, or None to not export.
+        queue_policy (str): Overflow policy of the queue between the receive thread and the GUI.
+        acquisition_process (bool): Receive and decode frames in a separate process.
+        schema (FrameSchema | None): Layout of the frames sent by the controller, defaults to the 4-channel layout.
+        compress (str | None): Compressor of recorded chunks, "zlib" or "lzma", or None to record raw frames.
+        buffer_capacity (int): Number of samples of history kept per channel.
+        render_fps (float): Maximum graph redraws per second.
+    """
     app = QApplication(sys.argv)
     context = get_app_context()
-    server = TCPServer(context)
-    window = MainWindow(context, server)
+    if schema:
+        context.set_schema(schema)
+    server = AcquisitionServer(context) if acquisition_process else TCPServer(context)
+    window = MainWindow(context, server, buffer_capacity=buffer_capacity, render_fps=render_fps, metrics_file=metrics_file, queue_policy=queue_policy, record_codec=compress)
     window.show()
     sys.exit(app.exec())
\ No newline at end of file
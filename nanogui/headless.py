@@ -0,0 +1,83 @@
+import logging
+import os
+import signal
+import threading
+from nanogui.aioserver import AsyncTCPServer
+from nanogui.context import get_app_context
+from nanogui.metrics import JsonLinesExporter, get_metrics
+from nanogui.recorder import CaptureRecorder
+from nanogui.schema import FrameSchema
+from nanogui.server import TCPServer
+from nanogui.sinks import DataSink, PerControllerSink, RateSink
+
+logger = logging.getLogger(__name__)
+
+def _start_recorder(path: str, schema: FrameSchema, codec: str | None) -> CaptureRecorder:
+    """Create and start a recorder."""
+    recorder = CaptureRecorder(path, schema=schema, codec=codec)
+    recorder.start()
+    logger.info(f"Recording to {path}")
+    return recorder
+
+def run_headless(host: str, port: int, record: str | None = None, stats_interval: float | None = 1.0, sinks: list[DataSink] | None = None, multi: bool = False, metrics_file: str | None = None, schema: FrameSchema | None = None, compress: str | None = None) -> None:
+    """Run the server without a GUI until interrupted.
+
+    params:
+        host (str): Host address to listen on.
+        port (int): Port number to listen on.
+        record (str | None): Capture file to record to, or None to not record.
+            With multiple controllers each one is recorded to the file name suffixed with its ID.
+        stats_interval (float | None): Seconds between frame rate reports, or None to disable them.
+        sinks (list[DataSink] | None): Additional consumers of received frames.
+        multi (bool): Whether to accept many controllers at once.
+        metrics_file (str | None): JSON lines file to export metrics to, or None to not export.
+        schema (FrameSchema | None): Layout of the frames sent by the controller, defaults to the 4-channel layout.
+        compress (str | None): Compressor of recorded chunks, "zlib" or "lzma", or None to record raw frames.
+    """
+    context = get_app_context()
+    context.set_host(host)
+    context.set_port(port)
+    if schema:
+        context.set_schema(schema)
+    server = AsyncTCPServer(context) if multi else TCPServer(context)
+
+    for sink in sinks or []:
+        server.add_sink(sink)
+    if stats_interval:
+        server.add_sink(RateSink(stats_interval))
+
+    recorders = []
+    if record and multi:
+        stem, extension = os.path.splitext(record)
+        def create_recorder(controller_id: int) -> CaptureRecorder:
+            recorders.append(_start_recorder(f"{stem}-{controller_id}{extension}", context.get_schema(), compress))
+            return recorders[-1]
+        server.add_sink(PerControllerSink(create_recorder))
+    elif record:
+        recorders.append(_start_recorder(record, context.get_schema(), compress))
+        server.add_sink(recorders[-1])
+
+    exporter = None
+    if metrics_file:
+        exporter = JsonLinesExporter(get_metrics(), metrics_file)
+        exporter.start()
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    try:
+        server.start_server()
+        while not stop.wait(0.5):
+            pass
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop_server()
+        if exporter:
+            exporter.stop()
+        for recorder in recorders:
+            try:
+                recorder.stop()
+            except (OSError, ValueError):
+                # already logged by the writer thread
+                continue
+            logger.info(f"Recorded {recorder.frames_written} frames to {recorder.path}")
@@ -0,0 +1,181 @@
+import atexit
+import logging
+import queue
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+LOGGER_NAME = "nanogui"
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_BACKUPS = 3
+REPEAT_WINDOW = 1.0
+FILE_FORMAT = "%(asctime)s %(levelname)-7s %(threadName)s %(name)s: %(message)s"
+
+_listener = None
+_repeat_filter = None
+
+class RepeatFilter(logging.Filter):
+    """Drop records repeating a message already logged within the last `window` seconds.
+
+    The next record of that message let through afterwards is suffixed with the
+    number of times it occurred, so an error storm costs one dictionary lookup
+    per record instead of a line of output each. When a storm stops, a timer
+    passes the count to `emit` once the window expires instead, and `flush`
+    does so for every pending count on shutdown.
+
+    params:
+        window (float): Seconds during which repeats of a message are dropped.
+        emit (Callable[[logging.LogRecord], None] | None): Receives the records reporting counts of stopped storms.
+    """
+    def __init__(self, window: float = REPEAT_WINDOW, emit=None) -> None:
+        super().__init__()
+        self._window = window
+        self._emit = emit
+        # (logger name, level, message) -> [time last let through, repeats dropped since, last record dropped]
+        self._seen = {}
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = (record.name, record.levelno, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            seen = self._seen.get(key)
+            if seen is not None and now - seen[0] < self._window:
+                seen[1] += 1
+                seen[2] = record
+                if self._emit and self._timer is None:
+                    self._schedule(seen[0] + self._window - now)
+                return False
+            if len(self._seen) > 1024:
+                self._seen = {k: v for k, v in self._seen.items() if now - v[0] < self._window or v[1]}
+            self._seen[key] = [now, 0, None]
+        if seen is not None and seen[1]:
+            record.msg = f"{record.msg} (×{seen[1] + 1} in last {now - seen[0]:.0f} s)"
+        return True
+
+    def flush(self, expired_only: bool = False) -> None:
+        """Emit the counts of dropped repeats that were not reported yet.
+
+        params:
+            expired_only (bool): Only emit counts whose window has expired.
+        """
+        now = time.monotonic()
+        records = []
+        with self._lock:
+            self._timer = None
+            for key, seen in list(self._seen.items()):
+                if not seen[1] or (expired_only and now - seen[0] < self._window):
+                    continue
+                record = logging.makeLogRecord(seen[2].__dict__)
+                record.msg = f"{record.msg} (×{seen[1] + 1} in last {now - seen[0]:.0f} s)"
+                records.append(record)
+                del self._seen[key]
+            pending = [seen[0] for seen in self._seen.values() if seen[1]]
+            if expired_only and self._emit and pending:
+                self._schedule(min(pending) + self._window - now)
+        if self._emit:
+            for record in records:
+                self._emit(record)
+
+    def cancel(self) -> None:
+        """Stop waiting for a window to expire."""
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+
+    def _schedule(self, delay: float) -> None:
+        """Flush the expired counts after `delay` seconds. Called with the lock held."""
+        self._timer = threading.Timer(max(delay, 0.0), self.flush, kwargs={"expired_only": True})
+        self._timer.daemon = True
+        self._timer.start()
+
+def setup_logging(log_file: str | None = None, level: int | str = logging.INFO, max_bytes: int = DEFAULT_MAX_BYTES, backups: int = DEFAULT_BACKUPS) -> None:
+    """Send the application's log records through a queue to a background writer.
+
+    Logging calls only put the record on an unbounded queue, so they never wait
+    on the console or the disk; a listener thread writes them to stdout and,
+    optionally, a rotating log file. Repeats of a message within a second are
+    dropped before they are queued. Call again to change the settings.
+
+    params:
+        log_file (str | None): File to also write records to, or None to only write to stdout.
+        level (int | str): Lowest level of records written.
+        max_bytes (int): Size at which the log file is rotated.
+        backups (int): Number of rotated log files kept.
+    """
+    global _listener
+    shutdown_logging()
+
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(logging.Formatter("%(message)s"))
+    handlers = [console]
+    if log_file:
+        file_handler = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+        file_handler.setFormatter(logging.Formatter(FILE_FORMAT))
+        handlers.append(file_handler)
+
+    records = queue.SimpleQueue()
+    _install(records, level)
+    _listener = QueueListener(records, *handlers)
+    _listener.start()
+
+def forward_logging(records, level: int | str) -> None:
+    """Send the application's log records to a queue read by another process.
+
+    Used by child processes, whose records are handled by the parent with
+    `handle_forwarded`.
+
+    params:
+        records (multiprocessing.Queue): Queue the parent process reads.
+        level (int | str): Lowest level of records sent.
+    """
+    _install(records, level)
+
+def handle_forwarded(records) -> None:
+    """Log the records forwarded by a child process so far, without waiting.
+
+    params:
+        records (multiprocessing.Queue): Queue passed to the child's `forward_logging`.
+    """
+    while True:
+        try:
+            record = records.get_nowait()
+        except (queue.Empty, OSError, ValueError):
+            return
+        logging.getLogger(record.name).handle(record)
+
+def _install(records, level: int | str) -> None:
+    """Replace the handlers of the application's logger with one putting records on a queue."""
+    global _repeat_filter
+    _flush_repeats()
+    queue_handler = QueueHandler(records)
+    _repeat_filter = RepeatFilter(emit=queue_handler.emit)
+    queue_handler.addFilter(_repeat_filter)
+    logger = logging.getLogger(LOGGER_NAME)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    logger.addHandler(queue_handler)
+    logger.setLevel(level)
+    logger.propagate = False
+
+def _flush_repeats() -> None:
+    """Queue the counts of repeats dropped by the installed filter and stop its timer."""
+    if _repeat_filter is not None:
+        _repeat_filter.cancel()
+        _repeat_filter.flush()
+
+def shutdown_logging() -> None:
+    """Write the queued records, including pending repeat counts, and stop the background writer, if running."""
+    global _listener
+    _flush_repeats()
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+
+atexit.register(shutdown_logging)
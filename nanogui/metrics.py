@@ -0,0 +1,250 @@
+import bisect
+import json
+import threading
+import time
+
+_metrics_instance = None
+
+# histogram bucket upper bounds in seconds, from 10 us to 10 s
+HISTOGRAM_BOUNDS = tuple(10 ** (exponent / 4) for exponent in range(-20, 5))
+
+class Counter:
+    """Monotonic counter, safe to increase from any thread.
+
+    Some counters have several producers, e.g. frames dropped by the GUI queue on
+    the receive thread and by the acquisition reader thread.
+    """
+    def __init__(self) -> None:
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, n: int = 1) -> None:
+        """Increase the counter.
+
+        params:
+            n (int): Amount to add.
+        """
+        with self._lock:
+            self.value += n
+
+class Gauge:
+    """Value that can go up and down, safe to change from any thread."""
+    def __init__(self) -> None:
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def set(self, value: float) -> None:
+        """Set the gauge.
+
+        params:
+            value (float): New value.
+        """
+        self.value = value
+
+    def inc(self, n: float = 1) -> None:
+        """Increase the gauge.
+
+        params:
+            n (float): Amount to add.
+        """
+        with self._lock:
+            self.value += n
+
+    def dec(self, n: float = 1) -> None:
+        """Decrease the gauge.
+
+        params:
+            n (float): Amount to subtract.
+        """
+        with self._lock:
+            self.value -= n
+
+class Histogram:
+    """Distribution of durations in logarithmic buckets."""
+    def __init__(self) -> None:
+        self.buckets = [0] * (len(HISTOGRAM_BOUNDS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record a duration.
+
+        params:
+            value (float): Duration in seconds.
+        """
+        self.buckets[bisect.bisect_left(HISTOGRAM_BOUNDS, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile as the upper bound of the bucket containing it.
+
+        params:
+            q (float): Quantile between 0 and 1.
+
+        returns:
+            float: Estimated duration in seconds.
+        """
+        if self.count == 0:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= target:
+                return min(HISTOGRAM_BOUNDS[i], self.max) if i < len(HISTOGRAM_BOUNDS) else self.max
+        return self.max
+
+    def summary(self) -> dict:
+        """Get count, mean, median, 99th percentile and maximum.
+
+        returns:
+            dict: Summary statistics in seconds.
+        """
+        return {
+            "count": self.count,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+            "max": self.max,
+        }
+
+class MetricsRegistry:
+    """Named pipeline counters, gauges and histograms."""
+    def __init__(self) -> None:
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str) -> Counter:
+        """Get or create a counter.
+
+        params:
+            name (str): Metric name.
+
+        returns:
+            Counter: The counter.
+        """
+        with self._lock:
+            return self._counters.setdefault(name, Counter())
+
+    def gauge(self, name: str) -> Gauge:
+        """Get or create a gauge.
+
+        params:
+            name (str): Metric name.
+
+        returns:
+            Gauge: The gauge.
+        """
+        with self._lock:
+            return self._gauges.setdefault(name, Gauge())
+
+    def histogram(self, name: str) -> Histogram:
+        """Get or create a histogram.
+
+        params:
+            name (str): Metric name.
+
+        returns:
+            Histogram: The histogram.
+        """
+        with self._lock:
+            return self._histograms.setdefault(name, Histogram())
+
+    def snapshot(self) -> dict:
+        """Get the current value of every metric.
+
+        returns:
+            dict: Time, counters, gauges and histogram summaries.
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            histograms = dict(self._histograms)
+        return {
+            "time": time.time(),
+            "counters": {name: counter.value for name, counter in counters.items()},
+            "gauges": {name: gauge.value for name, gauge in gauges.items()},
+            "histograms": {name: histogram.summary() for name, histogram in histograms.items()},
+        }
+
+class RateTracker:
+    """Turn successive snapshots into per-second counter rates.
+
+    params:
+        registry (MetricsRegistry): Registry to sample.
+    """
+    def __init__(self, registry: "MetricsRegistry") -> None:
+        self._registry = registry
+        self._last = registry.snapshot()
+
+    def sample(self) -> dict:
+        """Take a snapshot and add the counter rates since the previous sample.
+
+        returns:
+            dict: Snapshot with an additional "rates" entry.
+        """
+        snapshot = self._registry.snapshot()
+        elapsed = snapshot["time"] - self._last["time"]
+        previous = self._last["counters"]
+        snapshot["rates"] = {
+            name: (value - previous.get(name, 0)) / elapsed if elapsed > 0 else 0.0
+            for name, value in snapshot["counters"].items()
+        }
+        self._last = snapshot
+        return snapshot
+
+class JsonLinesExporter:
+    """Append a metrics snapshot with rates to a JSON lines file at a fixed interval.
+
+    params:
+        registry (MetricsRegistry): Registry to export.
+        path (str): Output file path.
+        interval (float): Seconds between snapshots.
+    """
+    def __init__(self, registry: MetricsRegistry, path: str, interval: float = 1.0) -> None:
+        self._registry = registry
+        self._path = path
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        """Start exporting on a background thread."""
+        if self._thread:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._export_loop, daemon=True)
+        self._thread.start()
+
+    def _export_loop(self) -> None:
+        """Write one line per interval until stopped."""
+        tracker = RateTracker(self._registry)
+        with open(self._path, "a") as file:
+            while not self._stop.wait(self._interval):
+                file.write(json.dumps(tracker.sample()) + "\n")
+                file.flush()
+
+    def stop(self) -> None:
+        """Stop exporting."""
+        if not self._thread:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+def get_metrics() -> MetricsRegistry:
+    """Get the metrics registry.
+
+    returns:
+        MetricsRegistry: The metrics registry singleton.
+    """
+    global _metrics_instance
+    if _metrics_instance is None:
+        _metrics_instance = MetricsRegistry()
+    return _metrics_instance
@@ -0,0 +1,135 @@
+import contextlib
+import cProfile
+import functools
+import pstats
+import threading
+import time
+from nanogui.metrics import get_metrics
+
+STAGE_PREFIX = "stage_seconds."
+RENDER_PREFIX = "render_seconds."
+
+_NULL_STAGE = contextlib.nullcontext()
+_enabled = False
+_trace = False
+_profiles = []
+_profiles_lock = threading.Lock()
+
+class _Stage:
+    """Context manager adding the duration of each pass through a stage to a histogram."""
+    __slots__ = ("_histogram", "_start")
+
+    def __init__(self, name: str) -> None:
+        self._histogram = get_metrics().histogram(STAGE_PREFIX + name)
+        self._start = 0.0
+
+    def __enter__(self) -> "_Stage":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *_) -> None:
+        self._histogram.observe(time.perf_counter() - self._start)
+
+def enable(trace: bool = False) -> None:
+    """Turn on stage timers, and optionally cProfile tracing of the calling thread and profiled threads.
+
+    Must be called before the pipeline objects are created, since they pick their
+    stage timers when constructed.
+
+    params:
+        trace (bool): Whether to record a cProfile trace.
+    """
+    global _enabled, _trace
+    _enabled = True
+    if trace and not _trace:
+        _trace = True
+        _start_profile()
+
+def stage(name: str):
+    """Get a timer for one pipeline stage, to be used as a context manager by a single thread.
+
+    When profiling is off this is a shared no-op context, so timed code pays
+    almost nothing.
+
+    params:
+        name (str): Stage name, e.g. "receive.decode".
+
+    returns:
+        Context manager timing the enclosed block into the `stage_seconds.<name>` histogram.
+    """
+    return _Stage(name) if _enabled else _NULL_STAGE
+
+def _start_profile() -> cProfile.Profile | None:
+    """Start a cProfile profile on the calling thread."""
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError:
+        # Python 3.12+ allows one active profiler, which already covers every thread
+        return None
+    with _profiles_lock:
+        _profiles.append(profile)
+    return profile
+
+def profiled(target):
+    """Wrap a thread target so the thread is traced when tracing is on.
+
+    params:
+        target (Callable): Thread target.
+
+    returns:
+        Callable: The target, wrapped only if tracing is on.
+    """
+    if not _trace:
+        return target
+
+    @functools.wraps(target)
+    def run(*args, **kwargs):
+        profile = _start_profile()
+        try:
+            return target(*args, **kwargs)
+        finally:
+            if profile:
+                profile.disable()
+    return run
+
+def report() -> str:
+    """Format the stage and render timers as a table.
+
+    returns:
+        str: One line per timer with its count, mean, p99, maximum and total time.
+    """
+    histograms = get_metrics().snapshot()["histograms"]
+    lines = [f"{'stage':<32}{'count':>10}{'mean us':>12}{'p99 us':>12}{'max us':>12}{'total s':>10}"]
+    for name in sorted(histograms):
+        summary = histograms[name]
+        if not name.startswith((STAGE_PREFIX, RENDER_PREFIX)) or summary["count"] == 0:
+            continue
+        total = summary["mean"] * summary["count"]
+        label = name.removeprefix(STAGE_PREFIX).replace(RENDER_PREFIX, "render.", 1)
+        lines.append(f"{label:<32}{summary['count']:>10}{summary['mean'] * 1e6:>12.1f}{summary['p99'] * 1e6:>12.1f}{summary['max'] * 1e6:>12.1f}{total:>10.3f}")
+    return "\n".join(lines)
+
+def finish(trace_file: str | None = None) -> None:
+    """Print the stage timers and write the cProfile trace, if any.
+
+    The trace is a pstats file, which can be browsed with `python -m pstats` or
+    turned into a flame graph with tools such as snakeviz or flameprof.
+
+    params:
+        trace_file (str | None): Path to write the merged cProfile trace to, or None to not write it.
+    """
+    if not _enabled:
+        return
+    print(report())
+    with _profiles_lock:
+        profiles = list(_profiles)
+    if not (trace_file and profiles):
+        return
+    for profile in profiles:
+        profile.disable()
+    stats = pstats.Stats(profiles[0])
+    for profile in profiles[1:]:
+        stats.add(profile)
+    stats.dump_stats(trace_file)
+    print(f"Wrote profile to {trace_file}")
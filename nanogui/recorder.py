@@ -0,0 +1,365 @@
+import json
+import logging
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from nanogui.compression import ChunkCodec
+from nanogui.schema import DEFAULT_SCHEMA, FrameSchema
+from nanogui.sinks import DataSink
+
+CAPTURE_MAGIC = b"NEPCAP01"
+CAPTURE_VERSION = 3
+CHUNK_MAGIC = b"CHNK"
+INDEX_MAGIC = b"NIDX"
+
+# magic, version
+PREFIX = struct.Struct("<8sH")
+# magic, version, start time, length of the JSON header (frame schema and chunk codec) that follows
+HEADER = struct.Struct("<8sHdI")
+# magic, frame count, first frame number, seconds since start, stored size of the frames
+CHUNK_HEADER = struct.Struct("<4sIQdQ")
+# magic, index offset, index entry count
+TRAILER = struct.Struct("<4sQQ")
+INDEX_DTYPE = np.dtype([("offset", "<u8"), ("frames", "<u4"), ("first_frame", "<u8"), ("wall_time", "<f8"), ("size", "<u8")])
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_FRAMES = 4096
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+class CaptureRecorder(DataSink):
+    """Write received frames to a capture file on a background thread.
+
+    The file starts with a header holding the frame schema and chunk codec as
+    JSON, followed by chunks of frames, each with a small chunk header. Chunks
+    hold raw frames in the wire format, or frames compressed independently by a
+    ChunkCodec when `codec` is set, so compression runs on the writer thread and
+    any chunk can be read without the others. A chunk index and trailer are
+    appended when the recording is stopped, so a capture can be memory-mapped
+    and sliced without reading it. Captures that were not closed cleanly are
+    indexed by walking the chunk headers instead.
+
+    If writing a chunk fails, the writer thread logs the error and stops,
+    further blocks are discarded and `stop` raises the error.
+
+    params:
+        path (str): Capture file path.
+        chunk_frames (int): Number of frames collected before a chunk is written.
+        flush_interval (float): Maximum seconds a partial chunk is held in memory.
+        schema (FrameSchema): Layout of the recorded frames.
+        codec (str | None): Chunk compressor, "zlib" or "lzma", or None to store raw frames.
+        level (int | None): Compression level, defaults to the codec's default.
+    """
+    def __init__(self, path: str, chunk_frames: int = DEFAULT_CHUNK_FRAMES, flush_interval: float = DEFAULT_FLUSH_INTERVAL, schema: FrameSchema = DEFAULT_SCHEMA, codec: str | None = None, level: int | None = None) -> None:
+        self._path = path
+        self._schema = schema
+        self._codec = ChunkCodec(schema, codec, level) if codec else None
+        self._chunk_frames = chunk_frames
+        self._flush_interval = flush_interval
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._file = None
+        self._start_time = 0.0
+        self._index = []
+        self._frames_written = 0
+        self._error = None
+
+    @property
+    def path(self) -> str:
+        """Capture file path."""
+        return self._path
+
+    @property
+    def frames_written(self) -> int:
+        """Number of frames written to disk so far."""
+        return self._frames_written
+
+    @property
+    def error(self) -> OSError | ValueError | None:
+        """Error that stopped the writer thread, or None."""
+        return self._error
+
+    def start(self) -> None:
+        """Create the capture file and start the writer thread."""
+        if self._thread:
+            return
+
+        self._file = open(self._path, "wb")
+        self._start_time = time.time()
+        codec = self._codec.codec if self._codec else None
+        level = self._codec.level if self._codec else None
+        header = json.dumps({"schema": self._schema.to_dict(), "codec": codec, "level": level}).encode()
+        self._file.write(HEADER.pack(CAPTURE_MAGIC, CAPTURE_VERSION, self._start_time, len(header)) + header)
+        self._index = []
+        self._frames_written = 0
+        self._error = None
+
+        self._thread = threading.Thread(target=self._write_loop, daemon=True)
+        self._thread.start()
+
+    def write(self, frames: np.ndarray, controller_id: int = 0) -> None:
+        """Queue a block of frames for writing. Never blocks on disk I/O.
+
+        params:
+            frames (np.ndarray): Frames with shape (n,) in the schema's dtype. Must not be modified afterwards.
+            controller_id (int): Controller the frames were received from.
+        """
+        if self._thread and self._error is None and len(frames):
+            self._queue.put((time.time(), frames))
+
+    def stop(self) -> None:
+        """Write any queued frames and the chunk index, then close the file.
+
+        raises:
+            OSError | ValueError: Writing a chunk failed. The file is closed without an index.
+        """
+        if not self._thread:
+            return
+
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+        if self._error is not None:
+            self._file.close()
+            self._file = None
+            raise self._error
+
+        index = np.array(self._index, dtype=INDEX_DTYPE)
+        index_offset = self._file.tell()
+        self._file.write(index.tobytes())
+        self._file.write(TRAILER.pack(INDEX_MAGIC, index_offset, len(index)))
+        self._file.close()
+        self._file = None
+
+    def _write_loop(self) -> None:
+        """Collect queued blocks into chunks and write them to disk."""
+        blocks = []
+        pending = 0
+        chunk_time = None
+        while True:
+            try:
+                item = self._queue.get(timeout=self._flush_interval)
+            except queue.Empty:
+                item = False
+
+            if item:
+                received, frames = item
+                if chunk_time is None:
+                    chunk_time = received
+                blocks.append(frames)
+                pending += len(frames)
+
+            if pending and (item is None or pending >= self._chunk_frames or time.time() - chunk_time >= self._flush_interval):
+                try:
+                    self._write_chunk(blocks, pending, chunk_time)
+                except (OSError, ValueError) as e:
+                    logger.error(f"Recording to {self._path} failed: {e}")
+                    self._error = e
+                    # release the blocks queued before the error until stop is called
+                    while item is not None:
+                        item = self._queue.get()
+                    return
+                blocks = []
+                pending = 0
+                chunk_time = None
+
+            if item is None:
+                break
+
+    def _write_chunk(self, blocks: list[np.ndarray], n_frames: int, received: float) -> None:
+        """Write one chunk of frames with a single bulk write."""
+        frames = np.concatenate(blocks)
+        if self._codec:
+            data = self._codec.encode(frames)
+        else:
+            data = frames.astype(self._schema.wire_dtype, copy=False).tobytes()
+        wall_time = received - self._start_time
+        offset = self._file.tell()
+        self._file.write(CHUNK_HEADER.pack(CHUNK_MAGIC, n_frames, self._frames_written, wall_time, len(data)) + data)
+        self._index.append((offset, n_frames, self._frames_written, wall_time, len(data)))
+        self._frames_written += n_frames
+
+class CaptureReader:
+    """Memory-mapped reader for capture files written by CaptureRecorder.
+
+    Raw chunks are returned as zero-copy views of the file. Compressed chunks
+    are decompressed on demand, and ranges spanning several chunks are
+    decompressed in parallel on a thread pool, since zlib, lzma and the NumPy
+    decoding steps release the GIL.
+
+    params:
+        path (str): Capture file path.
+        workers (int | None): Threads decompressing chunks in parallel, defaults to one per CPU.
+    """
+    def __init__(self, path: str, workers: int | None = None) -> None:
+        self._path = path
+        self._workers = workers
+        self._executor = None
+        self._codec = None
+        self._file = open(path, "rb")
+        self._size = os.fstat(self._file.fileno()).st_size
+        if self._size < HEADER.size:
+            self._file.close()
+            raise ValueError(f"{path} is not a capture file.")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version = PREFIX.unpack_from(self._map, 0)
+        if magic != CAPTURE_MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a capture file.")
+        try:
+            if version != CAPTURE_VERSION:
+                raise ValueError(f"Unsupported capture version {version}.")
+            _, _, self.start_time, header_size = HEADER.unpack_from(self._map, 0)
+            self._data_offset = HEADER.size + header_size
+            header = json.loads(self._map[HEADER.size:self._data_offset])
+            self.schema = FrameSchema.from_dict(header["schema"])
+            if header["codec"]:
+                self._codec = ChunkCodec(self.schema, header["codec"], header.get("level"))
+        except (ValueError, TypeError, KeyError):
+            self.close()
+            raise
+
+        self.dtype = self.schema.dtype if self._codec else self.schema.wire_dtype
+        self._frame_size = self.schema.frame_size
+        self.index = self._load_index()
+
+    @property
+    def codec(self) -> str | None:
+        """Chunk compressor of the capture, or None if chunks hold raw frames."""
+        return self._codec.codec if self._codec else None
+
+    def _load_index(self) -> np.ndarray:
+        """Load the chunk index from the trailer, or rebuild it from the chunk headers."""
+        if self._size >= self._data_offset + TRAILER.size:
+            magic, index_offset, count = TRAILER.unpack_from(self._map, self._size - TRAILER.size)
+            if magic == INDEX_MAGIC and index_offset + count * INDEX_DTYPE.itemsize + TRAILER.size == self._size:
+                return np.frombuffer(self._map, dtype=INDEX_DTYPE, count=count, offset=index_offset).copy()
+
+        entries = []
+        offset = self._data_offset
+        while offset + CHUNK_HEADER.size <= self._size:
+            magic, n_frames, first_frame, wall_time, size = CHUNK_HEADER.unpack_from(self._map, offset)
+            if magic != CHUNK_MAGIC:
+                break
+            available = self._size - offset - CHUNK_HEADER.size
+            if self._codec:
+                if size > available:
+                    # compressed chunks cannot be read partially
+                    break
+            else:
+                n_frames = min(n_frames, available // self._frame_size)
+                size = n_frames * self._frame_size
+            entries.append((offset, n_frames, first_frame, wall_time, size))
+            offset += CHUNK_HEADER.size + size
+        return np.array(entries, dtype=INDEX_DTYPE)
+
+    def __len__(self) -> int:
+        """Total number of frames in the capture."""
+        if len(self.index) == 0:
+            return 0
+        return int(self.index["first_frame"][-1] + self.index["frames"][-1])
+
+    def __enter__(self) -> "CaptureReader":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def chunk(self, i: int) -> np.ndarray:
+        """Get the frames of one chunk, as a zero-copy view unless the capture is compressed.
+
+        params:
+            i (int): Chunk number.
+
+        returns:
+            np.ndarray: Frames with shape (n,) in the capture's `dtype`.
+        """
+        entry = self.index[i]
+        offset = int(entry["offset"]) + CHUNK_HEADER.size
+        if self._codec:
+            return self._codec.decode(self._map[offset:offset + int(entry["size"])], int(entry["frames"]))
+        return np.frombuffer(self._map, dtype=self.dtype, count=int(entry["frames"]), offset=offset)
+
+    def chunks(self, first: int, last: int) -> list[np.ndarray]:
+        """Get the frames of a range of chunks, decompressing them in parallel.
+
+        params:
+            first (int): First chunk number.
+            last (int): Chunk number to stop before.
+
+        returns:
+            list[np.ndarray]: Frames of each chunk, as returned by `chunk`.
+        """
+        if not self._codec or last - first < 2:
+            return [self.chunk(i) for i in range(first, last)]
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self._workers, thread_name_prefix="capture-reader")
+        return list(self._executor.map(self.chunk, range(first, last)))
+
+    def frames(self, start: int = 0, stop: int | None = None) -> np.ndarray:
+        """Get a range of frames, touching only the chunks that contain them.
+
+        A range inside a single raw chunk is returned as a view, otherwise the
+        chunks are concatenated.
+
+        params:
+            start (int): First frame number.
+            stop (int | None): Frame number to stop before, defaults to the end.
+
+        returns:
+            np.ndarray: Frames with shape (n,) in the capture's `dtype`.
+        """
+        stop = len(self) if stop is None else min(stop, len(self))
+        if start >= stop:
+            return np.empty(0, dtype=self.dtype)
+
+        first_frames = self.index["first_frame"]
+        first = int(np.searchsorted(first_frames, start, side="right")) - 1
+        last = int(np.searchsorted(first_frames, stop, side="left"))
+
+        parts = []
+        for i, chunk in zip(range(first, last), self.chunks(first, last)):
+            chunk_start = int(first_frames[i])
+            parts.append(chunk[max(start - chunk_start, 0):stop - chunk_start])
+        return parts[0] if len(parts) == 1 else np.concatenate(parts).astype(self.dtype, copy=False)
+
+    def time_range(self, start: float, stop: float) -> np.ndarray:
+        """Get the frames received within a range of seconds since the start of the capture.
+
+        The range is resolved to chunk granularity using the chunk receive times.
+
+        params:
+            start (float): Start of the range in seconds.
+            stop (float): End of the range in seconds.
+
+        returns:
+            np.ndarray: Frames with shape (n,) in the capture's `dtype`.
+        """
+        wall_times = self.index["wall_time"]
+        first = max(int(np.searchsorted(wall_times, start, side="right")) - 1, 0)
+        last = int(np.searchsorted(wall_times, stop, side="right"))
+        if first >= last:
+            return np.empty(0, dtype=self.dtype)
+
+        start_frame = int(self.index["first_frame"][first])
+        stop_frame = int(self.index["first_frame"][last - 1] + self.index["frames"][last - 1])
+        return self.frames(start_frame, stop_frame)
+
+    def close(self) -> None:
+        """Close the capture file."""
+        if self._executor:
+            self._executor.shutdown()
+            self._executor = None
+        try:
+            self._map.close()
+        except BufferError:
+            # frame views are still alive, the map is released with them
+            pass
+        self._file.close()
@@ -0,0 +1,112 @@
+import socket
+import threading
+import time
+from nanogui.recorder import CaptureReader
+from nanogui.timeline import TimeUnwrapper
+
+DEFAULT_BATCH_FRAMES = 64
+
+class ReplayClient:
+    """Stand-in controller that streams a capture file to the server.
+
+    Frames are sent in the wire format recorded in the capture's frame schema,
+    so the server must use the same schema. Pacing follows the controller's time
+    counter relative to the first frame, scaled by `speed`: each batch is sent
+    once the time of its last sample has elapsed. A speed of None sends as fast
+    as the connection allows.
+
+    params:
+        path (str): Capture file path.
+        host (str): Server host address.
+        port (int): Server port number.
+        speed (float | None): Playback speed factor, or None for as fast as possible.
+        batch_frames (int): Number of frames per send.
+    """
+    def __init__(self, path: str, host: str, port: int, speed: float | None = 1.0, batch_frames: int = DEFAULT_BATCH_FRAMES) -> None:
+        if speed is not None and speed <= 0:
+            raise ValueError("Replay speed must be positive.")
+        self._path = path
+        self._host = host
+        self._port = port
+        self._speed = speed
+        self._batch_frames = batch_frames
+        self._socket = None
+        self._listener = None
+        self._running = False
+        self.frames_sent = 0
+        self.bytes_sent = 0
+
+    def run(self) -> None:
+        """Connect to the server and stream the whole capture."""
+        with CaptureReader(self._path) as reader:
+            self._socket = socket.create_connection((self._host, self._port))
+            self._running = True
+            print(f"Replaying {len(reader)} frames from {self._path} to {self._host}:{self._port}")
+            self._listener = threading.Thread(target=self._listen_for_control_bits, args=(self._socket,), daemon=True)
+            self._listener.start()
+
+            try:
+                self._stream(reader)
+            finally:
+                self.close()
+
+    def _stream(self, reader: CaptureReader) -> None:
+        """Send every chunk of the capture with the requested pacing."""
+        schema = reader.schema
+        unwrapper = TimeUnwrapper(schema.time_period)
+        origin = None
+        start = time.perf_counter()
+        for i in range(len(reader.index)):
+            frames = reader.chunk(i).astype(schema.wire_dtype, copy=False)
+            if self._speed is not None:
+                # unwrapped time counter of every sample, in microseconds
+                timeline = unwrapper.unwrap(frames[schema.time_field].reshape(-1))
+                if origin is None and len(timeline):
+                    origin = int(timeline[0])
+
+            for offset in range(0, len(frames), self._batch_frames):
+                if not self._running:
+                    return
+                batch = frames[offset:offset + self._batch_frames]
+                if self._speed is not None:
+                    target = (timeline[(offset + len(batch)) * schema.samples - 1] - origin) * 1e-6
+                    delay = target / self._speed - (time.perf_counter() - start)
+                    if delay > 0:
+                        time.sleep(delay)
+
+                self._socket.sendall(batch)
+                self.frames_sent += len(batch)
+                self.bytes_sent += batch.nbytes
+
+        elapsed = time.perf_counter() - start
+        rate = self.frames_sent / elapsed if elapsed > 0 else float("inf")
+        print(f"Sent {self.frames_sent} frames in {elapsed:.2f} s ({rate:.0f} frames/s)")
+
+    def _listen_for_control_bits(self, sock: socket.socket) -> None:
+        """Print control bits sent by the server."""
+        while self._running:
+            try:
+                response = sock.recv(1)
+            except OSError:
+                break
+            if not response:
+                if self._running:
+                    print("Server closed the connection.")
+                self._running = False
+                break
+            print(f"Received control bits: 0b{response[0]:08b}")
+
+    def close(self) -> None:
+        """Close the connection."""
+        self._running = False
+        if self._socket:
+            try:
+                # wake the listener blocked in recv, so the connection is closed now
+                self._socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            if self._listener and self._listener is not threading.current_thread():
+                self._listener.join()
+            self._listener = None
+            self._socket.close()
+            self._socket = None
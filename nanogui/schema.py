@@ -0,0 +1,173 @@
+import json
+from dataclasses import asdict, dataclass
+from functools import cached_property
+import numpy as np
+from numpy.lib import recfunctions
+
+BYTE_ORDERS = ("<", ">", "=")
+
+@dataclass(frozen=True)
+class FrameSchema:
+    """Declarative layout of one controller frame.
+
+    A frame holds `samples` consecutive samples of every channel, one channel
+    after the other, followed by the timestamps of those samples. All channels
+    share one sample type so they can be buffered together. The layout compiles
+    to a NumPy structured dtype, so a whole receive buffer is decoded with a
+    single call however many channels a frame has.
+
+    params:
+        channels (tuple[str, ...]): Channel names, in frame order.
+        samples (int): Samples per channel in one frame.
+        sample_type (str): NumPy type code of the channel samples, e.g. "i2".
+        time_type (str): NumPy type code of the timestamps, an unsigned wrapping counter, e.g. "u2".
+        byte_order (str): Byte order on the wire, "<", ">" or "=".
+        time_field (str): Name of the timestamp field.
+    """
+    channels: tuple[str, ...] = ("A", "B", "C", "D")
+    samples: int = 16
+    sample_type: str = "i2"
+    time_type: str = "u2"
+    byte_order: str = ">"
+    time_field: str = "time"
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "channels", tuple(self.channels))
+        if not self.channels:
+            raise ValueError("A frame schema needs at least one channel.")
+        if len(set(self.channels)) != len(self.channels) or self.time_field in self.channels:
+            raise ValueError("Channel and time field names must be unique.")
+        if self.samples <= 0:
+            raise ValueError("Samples per frame must be positive.")
+        if self.byte_order not in BYTE_ORDERS:
+            raise ValueError(f"Byte order must be one of {', '.join(BYTE_ORDERS)}.")
+        if np.dtype(self.sample_type).kind not in "iu":
+            raise ValueError("Sample type must be an integer type.")
+        if np.dtype(self.time_type).kind != "u":
+            raise ValueError("Time type must be an unsigned integer type.")
+
+    @cached_property
+    def wire_dtype(self) -> np.dtype:
+        """Structured dtype of one frame as sent by the controller."""
+        return self._compile(self.byte_order)
+
+    @cached_property
+    def dtype(self) -> np.dtype:
+        """Structured dtype of one decoded frame, in native byte order."""
+        return self._compile("=")
+
+    @property
+    def frame_size(self) -> int:
+        """Size of one frame in bytes."""
+        return self.wire_dtype.itemsize
+
+    @property
+    def sample_dtype(self) -> np.dtype:
+        """Native dtype of the channel samples."""
+        return np.dtype(self.sample_type)
+
+    @property
+    def time_period(self) -> int:
+        """Period of the wrapping time counter."""
+        return 1 << (8 * np.dtype(self.time_type).itemsize)
+
+    def _compile(self, byte_order: str) -> np.dtype:
+        """Build the structured dtype of a frame in a byte order."""
+        fields = [(name, byte_order + self.sample_type, (self.samples,)) for name in self.channels]
+        fields.append((self.time_field, byte_order + self.time_type, (self.samples,)))
+        return np.dtype(fields)
+
+    @cached_property
+    def _word_dtype(self) -> np.dtype | None:
+        """Unsigned wire dtype of one word if all fields share a size, else None."""
+        size = np.dtype(self.sample_type).itemsize
+        if np.dtype(self.time_type).itemsize != size:
+            return None
+        return np.dtype(f"{self.byte_order}u{size}")
+
+    def decode(self, buffer, count: int, offset: int = 0) -> np.ndarray:
+        """Decode wire frames into a native-endian copy.
+
+        When every field has the same size the frames are byte-swapped as plain
+        words, which is much faster than converting the structured dtype.
+
+        params:
+            buffer: Object exposing the received bytes.
+            count (int): Number of frames.
+            offset (int): Byte offset of the first frame.
+
+        returns:
+            np.ndarray: Frames with shape (count,) in `dtype`.
+        """
+        words = self._word_dtype
+        if words is None:
+            return np.frombuffer(buffer, dtype=self.wire_dtype, count=count, offset=offset).astype(self.dtype)
+        raw = np.frombuffer(buffer, dtype=words, count=count * (self.frame_size // words.itemsize), offset=offset)
+        return raw.astype(words.newbyteorder("=")).view(self.dtype)
+
+    def encode(self, frames: np.ndarray) -> bytes:
+        """Encode frames in the wire format.
+
+        params:
+            frames (np.ndarray): Frames in `dtype` or `wire_dtype`.
+
+        returns:
+            bytes: Wire bytes.
+        """
+        return frames.astype(self.wire_dtype, copy=False).tobytes()
+
+    def split(self, frames: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Split a block of frames into per-channel samples and timestamps.
+
+        params:
+            frames (np.ndarray): Frames with shape (n,) in `dtype` or `wire_dtype`.
+
+        returns:
+            tuple[np.ndarray, np.ndarray]: Values with shape (channels, n * samples)
+                and time with shape (n * samples,).
+        """
+        n_frames = len(frames)
+        samples = recfunctions.structured_to_unstructured(frames[list(self.channels)])
+        values = samples.reshape(n_frames, len(self.channels), self.samples).transpose(1, 0, 2).reshape(len(self.channels), n_frames * self.samples)
+        time = frames[self.time_field].reshape(n_frames * self.samples)
+        return values, time
+
+    def to_dict(self) -> dict:
+        """Get the schema as a JSON-compatible dict.
+
+        returns:
+            dict: Schema fields.
+        """
+        fields = asdict(self)
+        fields["channels"] = list(self.channels)
+        return fields
+
+    @classmethod
+    def from_dict(cls, fields: dict) -> "FrameSchema":
+        """Create a schema from a dict of its fields.
+
+        params:
+            fields (dict): Schema fields, missing ones take their defaults.
+
+        returns:
+            FrameSchema: The schema.
+        """
+        unknown = set(fields) - set(cls.__dataclass_fields__)
+        if unknown:
+            raise ValueError(f"Unknown frame schema fields: {', '.join(sorted(unknown))}.")
+        return cls(**fields)
+
+    @classmethod
+    def load(cls, path: str) -> "FrameSchema":
+        """Load a schema from a JSON file.
+
+        params:
+            path (str): Schema file path.
+
+        returns:
+            FrameSchema: The schema.
+        """
+        with open(path) as file:
+            return cls.from_dict(json.load(file))
+
+DEFAULT_SCHEMA = FrameSchema()
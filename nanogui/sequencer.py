@@ -0,0 +1,255 @@
+import threading
+import time
+from dataclasses import dataclass
+import numpy as np
+from nanogui.metrics import get_metrics
+
+# seconds before a step at which the sequencer stops sleeping and starts spinning
+DEFAULT_SPIN = 0.002
+
+RECORD_DTYPE = np.dtype([
+    ("step", np.int64),
+    ("pattern", np.uint8),
+    ("target", np.float64),
+    ("sent", np.float64),
+    ("done", np.float64),
+])
+
+def _parse_pattern(text: str) -> int:
+    """Parse an 8-bit pattern written in decimal, 0x hex or 0b binary."""
+    pattern = int(text, 0)
+    if not 0 <= pattern <= 0xFF:
+        raise ValueError(f"Pattern {text} does not fit in 8 bits.")
+    return pattern
+
+@dataclass(frozen=True)
+class SequenceProgram:
+    """Scripted control-bit program.
+
+    params:
+        steps (tuple[tuple[float, int], ...]): Time offset in seconds from the start of the program and 8-bit pattern of each step.
+        repeat (int): Number of times the steps are run.
+        period (float | None): Seconds between the starts of repetitions, required when repeating.
+    """
+    steps: tuple[tuple[float, int], ...]
+    repeat: int = 1
+    period: float | None = None
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "steps", tuple((float(offset), int(pattern)) for offset, pattern in self.steps))
+        if not self.steps:
+            raise ValueError("A sequence needs at least one step.")
+        offsets = [offset for offset, _ in self.steps]
+        if offsets[0] < 0 or any(b < a for a, b in zip(offsets, offsets[1:])):
+            raise ValueError("Step offsets must be non-negative and in order.")
+        if any(not 0 <= pattern <= 0xFF for _, pattern in self.steps):
+            raise ValueError("Patterns must fit in 8 bits.")
+        if self.repeat < 1:
+            raise ValueError("Repeat count must be at least 1.")
+        if self.repeat > 1 and (self.period is None or self.period <= offsets[-1]):
+            raise ValueError("Repeated sequences need a period longer than the last step offset.")
+
+    @property
+    def duration(self) -> float:
+        """Offset of the last step of the last repetition, in seconds."""
+        return (self.repeat - 1) * (self.period or 0.0) + self.steps[-1][0]
+
+    def schedule(self) -> tuple[np.ndarray, np.ndarray]:
+        """Get the offset and pattern of every step of every repetition.
+
+        returns:
+            tuple[np.ndarray, np.ndarray]: Offsets in seconds and patterns, in order.
+        """
+        offsets = np.array([offset for offset, _ in self.steps])
+        patterns = np.array([pattern for _, pattern in self.steps], dtype=np.uint8)
+        starts = np.arange(self.repeat) * (self.period or 0.0)
+        return (starts[:, None] + offsets).ravel(), np.tile(patterns, self.repeat)
+
+    @classmethod
+    def pulse_train(cls, high: int, width: float, period: float, count: int, low: int = 0) -> "SequenceProgram":
+        """Create a train of rectangular pulses.
+
+        params:
+            high (int): Pattern during a pulse.
+            width (float): Pulse width in seconds.
+            period (float): Seconds between pulse starts.
+            count (int): Number of pulses.
+            low (int): Pattern between pulses.
+
+        returns:
+            SequenceProgram: The program.
+        """
+        return cls(((0.0, high), (width, low)), repeat=count, period=period)
+
+    @classmethod
+    def parse(cls, text: str) -> "SequenceProgram":
+        """Parse a sequence from text.
+
+        Each line is a step `<offset ms> <pattern>`, with the pattern in decimal,
+        0x hex or 0b binary. `repeat <count>` and `period <ms>` lines set the
+        repetition, and `#` starts a comment.
+
+        params:
+            text (str): Sequence text.
+
+        returns:
+            SequenceProgram: The program.
+        """
+        steps = []
+        repeat = 1
+        period = None
+        for number, line in enumerate(text.splitlines(), 1):
+            fields = line.split("#", 1)[0].split()
+            if not fields:
+                continue
+            try:
+                if len(fields) != 2:
+                    raise ValueError("expected two fields")
+                if fields[0] == "repeat":
+                    repeat = int(fields[1])
+                elif fields[0] == "period":
+                    period = float(fields[1]) / 1000
+                else:
+                    steps.append((float(fields[0]) / 1000, _parse_pattern(fields[1])))
+            except ValueError as e:
+                raise ValueError(f"Line {number}: {e}") from None
+        return cls(tuple(steps), repeat, period)
+
+    @classmethod
+    def load(cls, path: str) -> "SequenceProgram":
+        """Load a sequence file.
+
+        params:
+            path (str): Sequence file path.
+
+        returns:
+            SequenceProgram: The program.
+        """
+        with open(path) as file:
+            return cls.parse(file.read())
+
+def jitter_stats(records: np.ndarray) -> dict:
+    """Summarize how far each step was sent from its scheduled time.
+
+    params:
+        records (np.ndarray): Step records as a RECORD_DTYPE array.
+
+    returns:
+        dict: Step count and mean, standard deviation, median, 99th percentile and maximum
+            lateness in seconds, plus the maximum send duration.
+    """
+    if len(records) == 0:
+        return {"steps": 0, "mean": 0.0, "std": 0.0, "p50": 0.0, "p99": 0.0, "max": 0.0, "send_max": 0.0}
+    lateness = records["sent"] - records["target"]
+    return {
+        "steps": len(records),
+        "mean": float(lateness.mean()),
+        "std": float(lateness.std()),
+        "p50": float(np.median(lateness)),
+        "p99": float(np.percentile(lateness, 99)),
+        "max": float(lateness.max()),
+        "send_max": float((records["done"] - records["sent"]).max()),
+    }
+
+class ControlSequencer:
+    """Run control-bit programs on a dedicated thread with low timing jitter.
+
+    The thread sleeps until shortly before each step and then spins on the
+    performance counter, so steps do not depend on the GUI or the coarse sleep
+    resolution. The time just before and after each send is recorded, and the
+    lateness of each step is added to the `sequencer_lateness_seconds` histogram.
+
+    params:
+        send (Callable[[int], None]): Function sending one 8-bit pattern, e.g. TCPServer.write_control_bits.
+        spin (float): Seconds before each step spent spinning instead of sleeping.
+        on_send (Callable[[int], None] | None): Called on the sequencer thread with each pattern after it is sent.
+    """
+    def __init__(self, send, spin: float = DEFAULT_SPIN, on_send=None) -> None:
+        self._send = send
+        self._spin = spin
+        self._on_send = on_send
+        self._thread = None
+        self._stop = threading.Event()
+        self._records = np.empty(0, dtype=RECORD_DTYPE)
+        self._completed = 0
+        self._lateness = get_metrics().histogram("sequencer_lateness_seconds")
+        self.error = None
+
+    @property
+    def running(self) -> bool:
+        """Whether a program is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, program: SequenceProgram, on_finished=None) -> None:
+        """Start running a program.
+
+        params:
+            program (SequenceProgram): Program to run.
+            on_finished (Callable[[dict], None] | None): Called on the sequencer thread with the jitter statistics when the program ends.
+        """
+        if self.running:
+            raise RuntimeError("A sequence is already running.")
+        offsets, patterns = program.schedule()
+        self._records = np.zeros(len(offsets), dtype=RECORD_DTYPE)
+        self._records["step"] = np.arange(len(offsets))
+        self._records["pattern"] = patterns
+        self._records["target"] = offsets
+        self._completed = 0
+        self.error = None
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(on_finished,), daemon=True, name="control-sequencer")
+        self._thread.start()
+
+    def _run(self, on_finished) -> None:
+        """Send every step at its scheduled time."""
+        records = self._records
+        start = time.perf_counter() + self._spin
+        try:
+            for i in range(len(records)):
+                target = start + records["target"][i]
+                remaining = target - time.perf_counter()
+                if remaining > self._spin and self._stop.wait(remaining - self._spin):
+                    break
+                while time.perf_counter() < target:
+                    if self._stop.is_set():
+                        break
+                if self._stop.is_set():
+                    break
+
+                sent = time.perf_counter()
+                self._send(int(records["pattern"][i]))
+                done = time.perf_counter()
+                records["sent"][i] = sent - start
+                records["done"][i] = done - start
+                self._lateness.observe(sent - target)
+                self._completed = i + 1
+                if self._on_send:
+                    self._on_send(int(records["pattern"][i]))
+        except OSError as e:
+            self.error = e
+
+        if on_finished:
+            on_finished(self.stats())
+
+    def stop(self) -> None:
+        """Stop the running program after the current step."""
+        self._stop.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def records(self) -> np.ndarray:
+        """Get the records of the steps sent so far.
+
+        returns:
+            np.ndarray: Step number, pattern, scheduled time, send start and send end in seconds
+                from the program start, as a RECORD_DTYPE array.
+        """
+        return self._records[:self._completed].copy()
+
+    def stats(self) -> dict:
+        """Get the jitter statistics of the steps sent so far.
+
+        returns:
+            dict: Statistics from jitter_stats.
+        """
+        return jitter_stats(self._records[:self._completed])
@@ -1,14 +1,18 @@
+import logging
 import socket
-import struct
 import threading
-from PySide6.QtCore import QObject, Signal
 from nanogui.context import ApplicationContext
+from nanogui.framing import FrameDecoder
+from nanogui import profiling
+from nanogui.metrics import get_metrics
+from nanogui.sinks import DataSink
 
-class ServerSignals(QObject):
-    data_received = Signal(list)
+logger = logging.getLogger(__name__)
 
 class TCPServer:
     """TCP server for sending control bits to a client.
+
+    Received frames are passed to the registered data sinks on the receive thread.
     
     params:
         context (ApplicationContext): The application context.
@@ -19,7 +23,23 @@ class TCPServer:
         self._client_socket = None
         self._client_address = None
         self._running = False
-        self.signals = ServerSignals()
+        self._sinks = ()
+
+    def add_sink(self, sink: DataSink) -> None:
+        """Add a consumer of received frames.
+
+        params:
+            sink (DataSink): The sink to add.
+        """
+        self._sinks = self._sinks + (sink,)
+
+    def remove_sink(self, sink: DataSink) -> None:
+        """Remove a consumer of received frames.
+
+        params:
+            sink (DataSink): Previously added sink.
+        """
+        self._sinks = tuple(s for s in self._sinks if s is not sink)
     
     def start_server(self) -> None:
         """Start server given host and port from context."""
@@ -27,14 +47,14 @@ class TCPServer:
         port = self._context.get_port()
 
         if not host or not port:
-            print("Please set the host and port.")
+            logger.warning("Please set the host and port.")
             self._context.set_message("Please set the host and port.")
             return
 
         self._server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self._server_socket.bind((host, port))
         self._server_socket.listen(1)
-        print(f"Server listening on {host}:{port}")
+        logger.info(f"Server listening on {host}:{port}")
         self._context.set_message(f"Server listening on {host}:{port}")
 
         self._running = True
@@ -45,44 +65,65 @@ class TCPServer:
         while self._running:
             try:
                 if not self._client_socket:
-                    print("Waiting for connection...")
+                    logger.info("Waiting for connection...")
                     self._context.set_message("Waiting for connection...")
 
                 self._client_socket, self._client_address = self._server_socket.accept()
-                print(f"Connection from {self._client_address}")
+                logger.info(f"Connection from {self._client_address}")
                 self._context.set_message(f"Connection from {self._client_address}")
-                threading.Thread(target=self._handle_client, daemon=True).start()
+                threading.Thread(target=profiling.profiled(self._handle_client), daemon=True).start()
             except OSError as e:
                 if self._running:
-                    print(str(e))
+                    logger.warning(str(e))
                     self._context.set_message(str(e))
                 break
 
 
     def _handle_client(self) -> None:
         """Handle client connection and incoming messages."""
+        decoder = FrameDecoder(self._context.get_schema())
+        metrics = get_metrics()
+        bytes_received = metrics.counter("bytes_received")
+        frames_received = metrics.counter("frames_received")
+        partial_frames = metrics.counter("partial_frames")
+        decode_stage = profiling.stage("receive.decode")
+        dispatch_stage = profiling.stage("receive.dispatch")
         while self._running and self._client_socket:
             try:
-                data = self._client_socket.recv(160)
-                if not data:
-                    print("Client disconnected.")
+                nbytes = self._client_socket.recv_into(decoder.get_buffer())
+                if nbytes == 0:
+                    logger.info("Client disconnected.")
                     self._context.set_message("Client disconnected.")
                     break
 
-                i16_list = list(struct.unpack('>80h', data))
-                # print(f"Received integers: {i16_list}")
-                self.signals.data_received.emit(i16_list)
+                with decode_stage:
+                    frames = decoder.commit(nbytes)
+                bytes_received.inc(nbytes)
+                frames_received.inc(len(frames))
+                if decoder.pending:
+                    partial_frames.inc()
+
+                if len(frames):
+                    with dispatch_stage:
+                        for sink in self._sinks:
+                            sink.write(frames)
             except ConnectionAbortedError:
-                print("Connection aborted by host.")
+                logger.warning("Connection aborted by host.")
                 self._context.set_message("Connection aborted by server.")
                 break
             except ConnectionResetError:
-                print("Client connection reset.")
+                logger.warning("Client connection reset.")
                 self._context.set_message("Client connection reset.")
                 break
-            except struct.error as e:
-                print(f"Error decoding data: {e}")
+            except OSError as e:
+                if self._running:
+                    logger.warning(str(e))
+                    self._context.set_message(str(e))
+                break
 
+        if decoder.pending:
+            # connection ended inside a frame
+            metrics.counter("decode_errors").inc()
         self._cleanup_client()
 
     def _cleanup_client(self) -> None:
@@ -93,37 +134,51 @@ class TCPServer:
             except OSError:
                 pass
 
-        self.signals.data_received.emit([])
+        for sink in self._sinks:
+            sink.connection_closed()
         self._client_socket = None
         self._client_address = None
-        print("Ready for a new connection.")
-        self._context.set_message("Ready for a new connection.")
+        if self._running:
+            logger.info("Ready for a new connection.")
+            self._context.set_message("Ready for a new connection.")
 
     def send_control_bits(self) -> None:
         """Send control bits to client."""
         if not self._running:
-            print("Server not running.")
+            logger.warning("Server not running.")
             self._context.set_message("Server not running.")
             return
         
         if self._client_socket:
             control_bits = self._context.get_control_bits()
-            self._client_socket.send(control_bits.to_bytes(1, byteorder="big"))
+            self.write_control_bits(control_bits)
 
             binary_representation = f"0b{control_bits:08b}"
-            print(f"Sent control bits: {binary_representation}")
+            logger.info(f"Sent control bits: {binary_representation}")
             self._context.set_message(f"Sent control bits: {binary_representation}")
         else:
-            print("Client not connected.")
+            logger.warning("Client not connected.")
             self._context.set_message("Client not connected.")
 
+    def write_control_bits(self, control_bits: int) -> None:
+        """Send an 8-bit control pattern to the client without reporting it.
+
+        Safe to call from any thread, e.g. the control sequencer's.
+
+        params:
+            control_bits (int): Control bits as an 8-bit integer.
+        """
+        client_socket = self._client_socket
+        if not client_socket:
+            raise ConnectionError("Client not connected.")
+        client_socket.sendall(control_bits.to_bytes(1, byteorder="big"))
+
     def stop_server(self) -> None:
         """Stop the server."""
         self._running = False
-        self.signals.data_received.emit([])
         if self._client_socket:
             self._client_socket.close()
         if self._server_socket:
             self._server_socket.close()
-        print("Server stopped.")
+        logger.info("Server stopped.")
         self._context.set_message("Server stopped.")
\ No newline at end of file
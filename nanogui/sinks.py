@@ -0,0 +1,88 @@
+import logging
+import time
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class DataSink:
+    """Consumer of received frame blocks.
+
+    Sinks are called on the server's receive thread and must return quickly.
+    """
+    def write(self, frames: np.ndarray, controller_id: int = 0) -> None:
+        """Consume a block of frames.
+
+        params:
+            frames (np.ndarray): Native-endian frames with shape (n,) in the frame schema's dtype. Must not be modified.
+            controller_id (int): Controller the frames were received from.
+        """
+        raise NotImplementedError
+
+    def connection_closed(self, controller_id: int = 0) -> None:
+        """Called when a controller connection is closed.
+
+        params:
+            controller_id (int): Controller whose connection was closed.
+        """
+
+class CallbackSink(DataSink):
+    """Sink forwarding every block to a callback.
+
+    params:
+        callback (Callable[[np.ndarray], None]): Function called with each block.
+    """
+    def __init__(self, callback) -> None:
+        self._callback = callback
+
+    def write(self, frames: np.ndarray, controller_id: int = 0) -> None:
+        self._callback(frames)
+
+class PerControllerSink(DataSink):
+    """Sink routing each controller's frames to its own sink.
+
+    params:
+        factory (Callable[[int], DataSink]): Function creating the sink for a new controller ID.
+    """
+    def __init__(self, factory) -> None:
+        self._factory = factory
+        self._sinks = {}
+
+    def write(self, frames: np.ndarray, controller_id: int = 0) -> None:
+        sink = self._sinks.get(controller_id)
+        if sink is None:
+            sink = self._sinks[controller_id] = self._factory(controller_id)
+        sink.write(frames, controller_id)
+
+    def connection_closed(self, controller_id: int = 0) -> None:
+        sink = self._sinks.get(controller_id)
+        if sink is not None:
+            sink.connection_closed(controller_id)
+
+    def sinks(self) -> dict[int, DataSink]:
+        """Get the sinks created so far.
+
+        returns:
+            dict[int, DataSink]: Sink for each controller ID.
+        """
+        return dict(self._sinks)
+
+class RateSink(DataSink):
+    """Sink logging the received frame rate at a fixed interval.
+
+    params:
+        interval (float): Seconds between reports.
+    """
+    def __init__(self, interval: float = 1.0) -> None:
+        self._interval = interval
+        self._frames = 0
+        self._last_report = time.perf_counter()
+        self.total_frames = 0
+
+    def write(self, frames: np.ndarray, controller_id: int = 0) -> None:
+        self._frames += len(frames)
+        self.total_frames += len(frames)
+        now = time.perf_counter()
+        if now - self._last_report >= self._interval:
+            logger.info(f"Receiving {self._frames / (now - self._last_report):.0f} frames/s ({self.total_frames} total)")
+            self._frames = 0
+            self._last_report = now
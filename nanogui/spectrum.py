@@ -0,0 +1,95 @@
+import numpy as np
+from nanogui.schema import DEFAULT_SCHEMA
+
+DEFAULT_SEGMENT = 4096
+DEFAULT_OVERLAP = 0.5
+DEFAULT_AVERAGES = 32
+
+class WelchAccumulator:
+    """Running Welch power spectral density of every channel.
+
+    Incoming samples are cut into Hann-windowed segments overlapping by
+    `overlap`, and the periodogram of each complete segment is folded into an
+    exponential average over roughly the last `averages` segments, so each sample
+    is transformed once and the spectrum follows changes such as a clogging pore.
+    Samples of an incomplete segment are carried to the next block.
+
+    params:
+        channels (int): Number of analog channels.
+        segment (int): Samples per FFT segment.
+        overlap (float): Fraction of each segment shared with the next one.
+        averages (int): Number of segments averaged over.
+    """
+    def __init__(self, channels: int = len(DEFAULT_SCHEMA.channels), segment: int = DEFAULT_SEGMENT, overlap: float = DEFAULT_OVERLAP, averages: int = DEFAULT_AVERAGES) -> None:
+        if not 0 <= overlap < 1:
+            raise ValueError("Overlap must be between 0 and 1.")
+        self._channels = channels
+        self._segment = segment
+        self._hop = max(int(segment * (1 - overlap)), 1)
+        self._averages = averages
+        self._window = np.hanning(segment).astype(np.float32)
+        self._window_power = float(np.sum(self._window.astype(np.float64) ** 2))
+        self._pending = np.empty((channels, 0), dtype=np.float32)
+        self._psd = np.zeros((channels, segment // 2 + 1))
+        self._sample_interval = None
+        self.segments = 0
+
+    @property
+    def frequencies(self) -> np.ndarray | None:
+        """Frequency of each PSD bin in Hz, or None before the sample rate is known."""
+        if self._sample_interval is None:
+            return None
+        return np.fft.rfftfreq(self._segment, self._sample_interval)
+
+    @property
+    def psd(self) -> np.ndarray:
+        """Power spectral density with shape (channels, segment // 2 + 1), in squared units per Hz."""
+        return self._psd
+
+    def append(self, values: np.ndarray, time: np.ndarray) -> int:
+        """Add a block of samples and update the spectrum with every completed segment.
+
+        params:
+            values (np.ndarray): Samples with shape (channels, n).
+            time (np.ndarray): Monotonic timestamps in microseconds with shape (n,).
+
+        returns:
+            int: Number of segments added.
+        """
+        if self._sample_interval is None:
+            if len(time) < 2:
+                return 0
+            self._sample_interval = float(np.median(np.diff(time))) * 1e-6
+
+        pending = np.concatenate((self._pending, values.astype(np.float32)), axis=1)
+        count = (pending.shape[1] - self._segment) // self._hop + 1 if pending.shape[1] >= self._segment else 0
+        if count == 0:
+            self._pending = pending
+            return 0
+
+        segments = np.lib.stride_tricks.sliding_window_view(pending, self._segment, axis=1)[:, ::self._hop][:, :count]
+        segments = segments - segments.mean(axis=2, keepdims=True)
+        spectrum = np.fft.rfft(segments * self._window, axis=2)
+        power = spectrum.real ** 2 + spectrum.imag ** 2
+
+        # one-sided density, the DC and Nyquist bins are not doubled
+        power *= 2.0 * self._sample_interval / self._window_power
+        power[:, :, 0] /= 2.0
+        if self._segment % 2 == 0:
+            power[:, :, -1] /= 2.0
+
+        # exponential average, warming up as a plain mean over the first segments
+        for k in range(count):
+            weight = 1.0 / min(self.segments + k + 1, self._averages)
+            self._psd += weight * (power[:, k] - self._psd)
+        self.segments += count
+
+        self._pending = pending[:, count * self._hop:].copy()
+        return count
+
+    def reset(self) -> None:
+        """Clear the spectrum and any carried samples."""
+        self._pending = np.empty((self._channels, 0), dtype=np.float32)
+        self._psd[:] = 0.0
+        self._sample_interval = None
+        self.segments = 0
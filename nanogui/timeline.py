@@ -0,0 +1,49 @@
+import numpy as np
+
+COUNTER_PERIOD = 1 << 16
+
+class TimeUnwrapper:
+    """Unwrap the controller's wrapping time counter into a monotonic int64 timeline.
+
+    Every step between consecutive samples is taken modulo the counter period, so
+    the timeline keeps increasing across wraps and blocks. Gaps longer than one
+    counter period (about 65 ms of microseconds for a 16-bit counter) cannot be
+    detected.
+
+    params:
+        period (int): Counter period, a power of two.
+    """
+    def __init__(self, period: int = COUNTER_PERIOD) -> None:
+        self._period = period
+        self._last_count = None
+        self._last_time = 0
+
+    def unwrap(self, counter: np.ndarray) -> np.ndarray:
+        """Convert raw counter values into timeline values.
+
+        params:
+            counter (np.ndarray): Raw counter values.
+
+        returns:
+            np.ndarray: Monotonic int64 timeline values.
+        """
+        counts = counter.astype(np.int64) & (self._period - 1)
+        if len(counts) == 0:
+            return counts
+
+        if self._last_count is None:
+            self._last_count = int(counts[0])
+            self._last_time = int(counts[0])
+
+        steps = np.diff(counts, prepend=self._last_count) % self._period
+        timeline = np.cumsum(steps)
+        timeline += self._last_time
+
+        self._last_count = int(counts[-1])
+        self._last_time = int(timeline[-1])
+        return timeline
+
+    def reset(self) -> None:
+        """Start a new timeline at the next counter value."""
+        self._last_count = None
+        self._last_time = 0
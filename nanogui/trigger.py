@@ -0,0 +1,208 @@
+import threading
+import numpy as np
+from nanogui.schema import DEFAULT_SCHEMA, FrameSchema
+from nanogui.sinks import DataSink
+from nanogui.timeline import TimeUnwrapper
+
+TRIGGER_MODES = ("rising", "falling", "above", "below")
+DEFAULT_PRE_SAMPLES = 256
+DEFAULT_POST_SAMPLES = 768
+DEFAULT_SWEEPS = 16
+
+class TriggerEngine:
+    """Capture fixed-size sweeps of every channel around trigger points.
+
+    Works like an oscilloscope in normal mode: once a sweep is triggered, no new
+    trigger is accepted until its post-trigger window is complete. A sweep holds
+    `pre` samples before the trigger and `post` samples from it onwards, and the
+    last `sweeps` sweeps are kept. Edge modes trigger when the source channel
+    crosses `level`, level modes whenever it is beyond it. With no source channel
+    the engine only triggers on `arm`, at the first sample of the next block, or
+    later if `pre` samples of history are not available yet or the previous
+    sweep is still being captured. An arm is kept until its sweep starts.
+
+    params:
+        channels (int): Number of analog channels.
+        source (int | None): Channel index to trigger on, or None for external triggers.
+        mode (str): One of "rising", "falling", "above" and "below".
+        level (float): Trigger level in signal units.
+        pre (int): Samples kept before the trigger.
+        post (int): Samples kept from the trigger onwards.
+        sweeps (int): Number of sweeps kept.
+    """
+    def __init__(self, channels: int = len(DEFAULT_SCHEMA.channels), source: int | None = 0, mode: str = "falling", level: float = 0.0,
+                 pre: int = DEFAULT_PRE_SAMPLES, post: int = DEFAULT_POST_SAMPLES, sweeps: int = DEFAULT_SWEEPS) -> None:
+        if mode not in TRIGGER_MODES:
+            raise ValueError(f"Trigger mode must be one of {', '.join(TRIGGER_MODES)}.")
+        if source is not None and not 0 <= source < channels:
+            raise ValueError("Trigger source must be a channel index.")
+        if pre < 0 or post < 1 or sweeps < 1:
+            raise ValueError("Trigger windows and sweep count must be positive.")
+        self.channels = channels
+        self.source = source
+        self.mode = mode
+        self.level = level
+        self.pre = pre
+        self.post = post
+
+        self._history = np.empty((channels, 0), dtype=np.float32)
+        # index in the history from which a new trigger is accepted
+        self._armed_from = 0
+        self._pending = None
+        self._external = False
+        self._sweeps = np.zeros((sweeps, channels, pre + post), dtype=np.float32)
+        self._sample_interval = None
+        self.count = 0
+
+    @property
+    def time_axis(self) -> np.ndarray | None:
+        """Time of each sweep sample relative to the trigger in microseconds, or None before the sample rate is known."""
+        if self._sample_interval is None:
+            return None
+        return np.arange(-self.pre, self.post) * self._sample_interval
+
+    def arm(self) -> None:
+        """Trigger at the next block when there is no source channel."""
+        self._external = self.source is None
+
+    def process(self, values: np.ndarray, time: np.ndarray) -> int:
+        """Look for triggers in a block of samples and capture the completed sweeps.
+
+        params:
+            values (np.ndarray): Samples with shape (channels, n).
+            time (np.ndarray): Monotonic timestamps in microseconds with shape (n,).
+
+        returns:
+            int: Number of sweeps completed.
+        """
+        if len(time) == 0:
+            return 0
+        if self._sample_interval is None and len(time) >= 2:
+            self._sample_interval = float(np.median(np.diff(time)))
+
+        carried = self._history.shape[1]
+        signal = np.concatenate((self._history, values.astype(np.float32)), axis=1)
+        n = signal.shape[1]
+        candidates = self._find_triggers(signal, carried)
+
+        completed = 0
+        position = self._pending
+        self._pending = None
+        while True:
+            if position is None and self.source is None:
+                if not self._external:
+                    break
+                position = max(carried, self._armed_from, self.pre)
+                self._external = False
+            elif position is None:
+                index = np.searchsorted(candidates, max(self._armed_from, self.pre), side="left")
+                if index == len(candidates):
+                    break
+                position = int(candidates[index])
+            if position + self.post > n:
+                self._pending = position
+                break
+            self._sweeps[self.count % len(self._sweeps)] = signal[:, position - self.pre:position + self.post]
+            self.count += 1
+            completed += 1
+            self._armed_from = position + self.post
+            position = None
+
+        # keep enough history for the pre-trigger window and any pending sweep
+        keep = self._pending - self.pre if self._pending is not None else max(n - self.pre, 0)
+        self._history = signal[:, keep:].copy()
+        self._armed_from = max(self._armed_from - keep, 0)
+        if self._pending is not None:
+            self._pending -= keep
+        return completed
+
+    def _find_triggers(self, signal: np.ndarray, carried: int) -> np.ndarray:
+        """Get the indices of the new samples that satisfy the trigger condition."""
+        if self.source is None:
+            # external triggers are placed by process
+            return np.empty(0, dtype=np.int64)
+
+        x = signal[self.source]
+        first = max(carried, 1)
+        current = x[first:]
+        previous = x[first - 1:-1]
+        if self.mode == "rising":
+            hits = (previous < self.level) & (current >= self.level)
+        elif self.mode == "falling":
+            hits = (previous > self.level) & (current <= self.level)
+        elif self.mode == "above":
+            hits = current > self.level
+        else:
+            hits = current < self.level
+        return np.flatnonzero(hits) + first
+
+    def sweeps(self) -> np.ndarray:
+        """Get the kept sweeps, oldest first.
+
+        returns:
+            np.ndarray: Sweeps with shape (k, channels, pre + post).
+        """
+        kept = min(self.count, len(self._sweeps))
+        order = np.arange(self.count - kept, self.count) % len(self._sweeps)
+        return self._sweeps[order]
+
+    def average(self) -> np.ndarray | None:
+        """Get the average of the kept sweeps.
+
+        returns:
+            np.ndarray | None: Average sweep with shape (channels, pre + post), or None before the first sweep.
+        """
+        if self.count == 0:
+            return None
+        return self.sweeps().mean(axis=0)
+
+class TriggerSink(DataSink):
+    """Run a trigger engine on the receive thread so triggers are placed as data arrives.
+
+    External triggers such as control-bit changes are armed from any thread and
+    fire at the first sample received afterwards. The engine can be replaced from
+    the GUI thread to change its settings.
+
+    params:
+        engine (TriggerEngine | None): Engine to use, defaults to one with default settings for the schema's channels.
+        schema (FrameSchema): Layout of the received frames.
+    """
+    def __init__(self, engine: TriggerEngine | None = None, schema: FrameSchema = DEFAULT_SCHEMA) -> None:
+        self._schema = schema
+        self._engine = engine or TriggerEngine(len(schema.channels))
+        self._unwrapper = TimeUnwrapper(schema.time_period)
+        self._lock = threading.Lock()
+
+    @property
+    def engine(self) -> TriggerEngine:
+        """Current trigger engine."""
+        return self._engine
+
+    def set_engine(self, engine: TriggerEngine) -> None:
+        """Replace the trigger engine, discarding the sweeps of the old one.
+
+        params:
+            engine (TriggerEngine): New engine.
+        """
+        with self._lock:
+            self._engine = engine
+
+    def arm(self) -> None:
+        """Trigger at the next received sample if the engine uses external triggers."""
+        self._engine.arm()
+
+    def write(self, frames: np.ndarray, controller_id: int = 0) -> None:
+        values, counter = self._schema.split(frames)
+        time = self._unwrapper.unwrap(counter)
+        with self._lock:
+            self._engine.process(values, time)
+
+    def snapshot(self) -> tuple[int, np.ndarray, np.ndarray | None]:
+        """Get a consistent copy of the sweeps for drawing.
+
+        returns:
+            tuple[int, np.ndarray, np.ndarray | None]: Number of sweeps captured so far,
+                the kept sweeps oldest first and the sweep time axis in microseconds.
+        """
+        with self._lock:
+            return self._engine.count, self._engine.sweeps(), self._engine.time_axis
@@ -15,7 +15,7 @@ setup(
     ],
     entry_points={
         "console_scripts": [
-            "nanogui=nanogui.gui:run",
+            "nanogui=nanogui.cli:main",
         ]
     },
     python_requires=">=3.12",
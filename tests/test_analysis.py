@@ -0,0 +1,56 @@
+import numpy as np
+from nanogui.analysis import analyze
+from nanogui.recorder import CaptureRecorder
+from nanogui.schema import DEFAULT_SCHEMA
+
+CHUNK_FRAMES = 256
+CHUNKS = 48
+BASELINE_WINDOW = 1024
+
+def _write_capture(path: str, events: list[tuple[int, int, int]]) -> None:
+    """Write a noisy capture with a drop of 400 on the given (channel, start, length) samples."""
+    schema = DEFAULT_SCHEMA
+    n_samples = CHUNK_FRAMES * CHUNKS * schema.samples
+    rng = np.random.default_rng(1)
+    values = 1000 + rng.normal(0, 20, (len(schema.channels), n_samples))
+    for channel, start, length in events:
+        values[channel, start:start + length] -= 400
+
+    n_frames = n_samples // schema.samples
+    frames = np.zeros(n_frames, dtype=schema.dtype)
+    for i, name in enumerate(schema.channels):
+        frames[name] = values[i].astype(schema.sample_dtype).reshape(n_frames, schema.samples)
+    frames[schema.time_field] = (np.arange(n_samples) % schema.time_period).reshape(n_frames, schema.samples)
+
+    recorder = CaptureRecorder(path, chunk_frames=CHUNK_FRAMES, schema=schema)
+    recorder.start()
+    for offset in range(0, n_frames, CHUNK_FRAMES):
+        recorder.write(frames[offset:offset + CHUNK_FRAMES])
+    recorder.stop()
+
+def test_results_do_not_depend_on_span_size(tmp_path):
+    samples_per_chunk = CHUNK_FRAMES * DEFAULT_SCHEMA.samples
+    injected = [
+        (0, 5000, 300),
+        # crossing chunk boundaries
+        (1, 2 * samples_per_chunk - 100, 400),
+        (2, 6 * samples_per_chunk - 10, 50),
+        # open for longer than the baseline window after a chunk boundary
+        (3, 9 * samples_per_chunk - 200, 3 * BASELINE_WINDOW),
+        (0, 20 * samples_per_chunk - 500, 2 * samples_per_chunk),
+        (1, 30 * samples_per_chunk + 1234, 800),
+        (2, 40 * samples_per_chunk + 4000, 200),
+    ]
+    path = str(tmp_path / "capture.nep")
+    _write_capture(path, injected)
+
+    single_events, single_stats = analyze([path], workers=2, span_frames=CHUNK_FRAMES * CHUNKS, baseline_window=BASELINE_WINDOW)
+    # the time counter steps by one microsecond per sample
+    found = {(int(row["channel"]), round(row["start"] * 1e6)) for row in single_events}
+    assert {(channel, start) for channel, start, _ in injected} <= found
+
+    for span_frames in (CHUNK_FRAMES, 3 * CHUNK_FRAMES, 7 * CHUNK_FRAMES):
+        events, stats = analyze([path], workers=2, span_frames=span_frames, baseline_window=BASELINE_WINDOW)
+        np.testing.assert_array_equal(events, single_events)
+        for name in stats.dtype.names:
+            np.testing.assert_allclose(stats[name], single_stats[name])